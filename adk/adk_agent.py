@@ -1,35 +1,200 @@
 import logging
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-def get_trip_context(uid: str) -> dict | None:
+# Most recent messages kept verbatim per session; older ones are compacted
+# into the session summary.
+CHAT_HISTORY_WINDOW = int(os.getenv("CHAT_HISTORY_WINDOW", 20))
+CHAT_SUMMARY_MAX_CHARS = int(os.getenv("CHAT_SUMMARY_MAX_CHARS", 2000))
+CHAT_MAX_SESSIONS = int(os.getenv("CHAT_MAX_SESSIONS", 10000))
+CHAT_SESSION_TTL = float(os.getenv("CHAT_SESSION_TTL", 6 * 3600))
+
+# Characters of each compacted message kept in the summary
+_SUMMARY_SNIPPET = 160
+
+# Seconds between streamed tokens of the mock reply, to mimic a model
+CHAT_STREAM_DELAY = float(os.getenv("CHAT_STREAM_DELAY", 0.0))
+
+_MOCK_REPLY = "That sounds like a wonderful plan! I've made a note of it. What other details should we consider for your trip to Paris? Perhaps we can think about some budget options?"
+_TOKEN = re.compile(r"\S+\s*")
+
+
+class ChatSession:
     """
-    Returns a mock trip context for the given UID.
+    One conversation: a bounded window of recent messages plus a running
+    summary of everything that scrolled out of it.
     """
-    logging.info(f"Fetching mock trip context for uid: {uid}")
-    return {
-        "destination": "Paris, France",
-        "startDate": "2025-10-15",
-        "endDate": "2025-10-22",
-        "tripStyle": ["sightseeing", "foodie", "romantic"],
-        "travelers": ["couple"],
-    }
 
-def chat(uid: str, destination: str, message: str, session_history: list) -> dict:
+    def __init__(self, session_id, window=CHAT_HISTORY_WINDOW):
+        self.session_id = session_id
+        self.summary = ""
+        self.messages = deque()
+        self.window = window
+        self.last_used = time.monotonic()
+        self.lock = threading.Lock()
+
+    def append(self, role, content):
+        self.messages.append({"role": role, "content": content})
+        while len(self.messages) > self.window:
+            self._compact(self.messages.popleft())
+
+    def context(self):
+        """
+        Returns the messages an agent should see: the summary, if any, as a
+        system message followed by the recent window.
+        """
+        context = [{"role": "system", "content": f"Earlier in this conversation: {self.summary}"}] if self.summary else []
+        context.extend(self.messages)
+        return context
+
+    def _compact(self, message):
+        snippet = message["content"][:_SUMMARY_SNIPPET]
+        self.summary = f"{self.summary} {message['role']}: {snippet}".strip()
+        if len(self.summary) > CHAT_SUMMARY_MAX_CHARS:
+            self.summary = self.summary[-CHAT_SUMMARY_MAX_CHARS:]
+
+
+class ChatSessionStore:
+    """
+    Chat sessions keyed by (uid, session_id).
+
+    Sessions idle for longer than `ttl` seconds are dropped, and the least
+    recently used ones are evicted beyond `max_sessions`.
+    """
+
+    def __init__(self, max_sessions=CHAT_MAX_SESSIONS, ttl=CHAT_SESSION_TTL):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, uid, session_id):
+        """
+        Returns the live session, or None.
+        """
+        with self._lock:
+            session = self._sessions.get((uid, session_id))
+            if session is None:
+                return None
+            if time.monotonic() - session.last_used > self.ttl:
+                del self._sessions[(uid, session_id)]
+                return None
+            self._sessions.move_to_end((uid, session_id))
+            return session
+
+    def get_or_create(self, uid, session_id=None):
+        """
+        Returns the uid's session, starting a new one if session_id is
+        missing, unknown or expired.
+        """
+        session_id = session_id or uuid.uuid4().hex
+        session = self.get(uid, session_id)
+        if session is not None:
+            return session
+
+        with self._lock:
+            session = self._sessions.setdefault((uid, session_id), ChatSession(session_id))
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return session
+
+    def delete(self, uid, session_id):
+        with self._lock:
+            self._sessions.pop((uid, session_id), None)
+
+
+_sessions = ChatSessionStore()
+
+
+def _generate_reply(context: list):
+    """
+    Yields the mock reply a token at a time, the way a model streams output.
+    A real agent would be prompted with the session context.
+    """
+    for token in _TOKEN.findall(_MOCK_REPLY):
+        if CHAT_STREAM_DELAY:
+            time.sleep(CHAT_STREAM_DELAY)
+        yield token
+
+
+def _record(session: ChatSession, role: str, content: str) -> dict:
+    with session.lock:
+        session.append(role, content)
+        session.last_used = time.monotonic()
+        return {"role": role, "content": content}
+
+
+def chat(uid: str, destination: str, message: str, session_id: str | None = None,
+         session_history: list | None = None) -> dict:
     """
     Generates a mock, friendly response to the user's message.
+
+    The conversation is kept server side; callers send only the new message
+    and get back the session id and the messages added by this turn.
+
+    Clients built before server-side sessions send their whole transcript as
+    session_history and expect it back extended by this turn; for them the
+    response also carries "session_history".
     """
-    logger.info(f"Generating mock chat response for UID: {uid}")
+    session = _sessions.get_or_create(uid, session_id)
+    logger.info(f"Generating mock chat response for UID: {uid}, session: {session.session_id}")
 
-    mock_response = {
-        "session_history": session_history + [
-            {"role": "user", "content": message},
-            {
-                "role": "assistant",
-                "content": "That sounds like a wonderful plan! I've made a note of it. What other details should we consider for your trip to Paris? Perhaps we can think about some budget options?"
-            }
-        ]
+    user_message = _record(session, "user", message)
+    reply = _record(session, "assistant", "".join(_generate_reply(session.context())))
+
+    response = {
+        "session_id": session.session_id,
+        "messages": [user_message, reply],
     }
+    if session_history is not None:
+        response["session_history"] = list(session_history) + response["messages"]
+    return response
+
+
+def chat_stream(uid: str, destination: str, message: str, session_id: str | None = None):
+    """
+    Streaming chat() with the same session semantics.
+
+    Yields {"session_id"} first, then {"delta"} per token as the reply is
+    generated, then {"done": True, "message"} with the full reply. If the
+    stream is closed early, whatever was generated is kept in the session.
+    """
+    session = _sessions.get_or_create(uid, session_id)
+    logger.info(f"Streaming mock chat response for UID: {uid}, session: {session.session_id}")
+
+    _record(session, "user", message)
+    yield {"session_id": session.session_id}
+
+    tokens = []
+    try:
+        for token in _generate_reply(session.context()):
+            tokens.append(token)
+            yield {"delta": token}
+    finally:
+        reply = _record(session, "assistant", "".join(tokens))
+
+    yield {"done": True, "message": reply}
+
+
+def get_session_history(uid: str, session_id: str) -> dict | None:
+    """
+    Returns the summary and recent messages of a session, or None if it does
+    not exist or has expired.
+    """
+    session = _sessions.get(uid, session_id)
+    if session is None:
+        return None
 
-    return mock_response
+    with session.lock:
+        return {
+            "session_id": session.session_id,
+            "summary": session.summary,
+            "session_history": list(session.messages),
+        }
@@ -1,47 +1,537 @@
+import asyncio
+import fcntl
+import gzip
 import hashlib
+import heapq
 import json
+import logging
+import os
+import threading
 import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from shared_cache import SharedCacheTier
+
+# xxhash is preferred for cache keys; fall back to BLAKE2 when it is missing.
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 3600
+MAX_ENTRIES = int(os.getenv("MCP_CACHE_MAX_ENTRIES", 2048))
+MAX_BYTES = int(os.getenv("MCP_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+SHARED_CACHE_ENABLED = os.getenv("MCP_SHARED_CACHE", "1") == "1"
+# With the shared tier on, each worker only keeps a small hot set in memory;
+# the full working set lives once per host in the shared tier.
+SHARED_LOCAL_MAX_BYTES = int(os.getenv("MCP_CACHE_SHARED_LOCAL_MAX_BYTES", 8 * 1024 * 1024))
+# Kept next to the service (/app/.cache in the container, a named volume in
+# docker-compose) so snapshots outlive the container.
+SNAPSHOT_PATH = os.getenv(
+    "MCP_CACHE_SNAPSHOT_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "mcp_cache_snapshot.jsonl.gz"),
+)
+SNAPSHOT_INTERVAL = int(os.getenv("MCP_CACHE_SNAPSHOT_INTERVAL", 300))
+
+
+class _CacheEntry:
+    __slots__ = ("response", "expires_at", "stale_until", "size")
+
+    def __init__(self, response, expires_at, stale_until, size):
+        self.response = response
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+        self.size = size
+
+
+class MCPCache:
+    """
+    Bounded in-memory cache with LRU eviction and TTL expiry.
+
+    Entries are evicted least-recently-used first once either the entry count
+    or the byte budget is exceeded. Expired entries are removed proactively
+    through an expiry heap rather than waiting to be looked up again.
+
+    An entry stored with max_stale > 0 is kept for that long past its TTL so
+    it can still be served while a refresh is in progress.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._expiry_heap = []
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def get(self, key):
+        response, is_fresh = self.lookup(key)
+        return response if is_fresh else None
+
+    def lookup(self, key):
+        """
+        Returns (response, is_fresh). Expired entries still inside their
+        stale window come back with is_fresh False; misses return (None, False).
+        """
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None, False
+            self._entries.move_to_end(key)
+            if now < entry.expires_at:
+                self._stats["hits"] += 1
+                return entry.response, True
+            self._stats["stale_hits"] += 1
+            return entry.response, False
+
+    def set(self, key, response, ttl=DEFAULT_TTL, max_stale=0, size=None):
+        if size is None:
+            size = _estimate_size(response)
+        if size > self.max_bytes:
+            # Too large to cache; drop any older value so it is not served
+            with self._lock:
+                self._remove(key)
+            return
+
+        now = time.time()
+        with self._lock:
+            self._remove(key)
+            entry = _CacheEntry(response, now + ttl, now + ttl + max_stale, size)
+            self._entries[key] = entry
+            self._bytes += size
+            heapq.heappush(self._expiry_heap, (entry.stale_until, key))
+
+            self._expire(now)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self._stats["evictions"] += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._expiry_heap.clear()
+            self._bytes = 0
+
+    def live_items(self):
+        """
+        Returns (key, response, expires_at, stale_until) for every entry that
+        can still be served, least recently used first.
+        """
+        now = time.time()
+        with self._lock:
+            return [
+                (key, entry.response, entry.expires_at, entry.stale_until)
+                for key, entry in self._entries.items()
+                if entry.stale_until > now
+            ]
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+        return entry
+
+    def _expire(self, now):
+        # Heap items are outdated when a key was overwritten or evicted, so
+        # only drop the entry if its current deadline matches the heap item.
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            stale_until, key = heapq.heappop(heap)
+            entry = self._entries.get(key)
+            if entry is not None and entry.stale_until == stale_until:
+                self._remove(key)
+                self._stats["expirations"] += 1
+
+        # Keep the heap from growing past the live entries by rebuilding it
+        # once outdated items dominate.
+        if len(heap) > 2 * len(self._entries) + 64:
+            self._expiry_heap = [(e.stale_until, k) for k, e in self._entries.items()]
+            heapq.heapify(self._expiry_heap)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent coroutine calls that share a key into one execution.
+
+    The first caller for a key starts the call as a task; callers that arrive
+    while it is running await the same task and share its result (or its
+    exception). The task is shielded, so a cancelled caller does not cancel
+    the fetch for everyone else.
+    """
+
+    def __init__(self):
+        self._calls = {}
+
+    def is_running(self, key):
+        return key in self._calls
+
+    async def do(self, key, coro_fn):
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(coro_fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        return await asyncio.shield(task)
+
 
 # In-memory cache
-_mcp_cache = {}
+_mcp_cache = MCPCache(max_bytes=SHARED_LOCAL_MAX_BYTES if SHARED_CACHE_ENABLED else MAX_BYTES)
+
+# Cache tier shared by every worker process on the host
+_shared_tier = SharedCacheTier() if SHARED_CACHE_ENABLED else None
+
+# MCP fetches currently in progress, keyed like the cache
+_mcp_inflight = SingleFlight()
+
+# MCP id -> trip_details keys that MCP actually reads. MCPs without an entry
+# are keyed on the whole input.
+_mcp_key_fields = {}
+
+# MCP id -> seconds an expired response may still be served while it is
+# refreshed in the background. MCPs without an entry never serve stale data.
+_mcp_max_stale = {}
+
+def configure_key_fields(field_to_mcp_map, trip_fields):
+    """
+    Derives the trip_details keys each MCP's cache key is projected onto.
+
+    Args:
+        field_to_mcp_map: Trip field -> MCPs that depend on it.
+        trip_fields: Trip field -> trip_details keys holding its value.
+    """
+    key_fields = {}
+    for field, mcp_ids in field_to_mcp_map.items():
+        for mcp_id in mcp_ids:
+            key_fields.setdefault(mcp_id, set()).update(trip_fields.get(field, [field]))
+
+    _mcp_key_fields.clear()
+    _mcp_key_fields.update({mcp_id: tuple(sorted(keys)) for mcp_id, keys in key_fields.items()})
+
+def configure_stale_windows(max_stale_by_mcp):
+    """
+    Enables stale-while-revalidate for the given MCPs.
+
+    Args:
+        max_stale_by_mcp: MCP id -> seconds past TTL a response may be served
+            while a background refresh runs. Past that, callers block.
+    """
+    _mcp_max_stale.clear()
+    _mcp_max_stale.update(max_stale_by_mcp)
+
+def build_cache_key(mcp_id, input_data):
+    """
+    Builds the cache key for an MCP from only the inputs that MCP reads.
+    """
+    key_fields = _mcp_key_fields.get(mcp_id)
+    if key_fields is None:
+        projected = input_data
+    else:
+        projected = tuple(input_data.get(key) for key in key_fields)
+
+    return f"{mcp_id}:{_generate_input_hash(projected)}"
 
 def get_cached_response(mcp_id, input_data):
     """
     Retrieves a cached response if available and not expired.
     """
-    input_hash = _generate_input_hash(input_data)
-    cache_key = f"{mcp_id}:{input_hash}"
-    
-    cached_item = _mcp_cache.get(cache_key)
-    
-    if cached_item and not _is_expired(cached_item):
-        return cached_item['response']
-    
-    return None
+    response, is_fresh = _lookup(build_cache_key(mcp_id, input_data))
+    return response if is_fresh else None
 
-def set_cached_response(mcp_id, input_data, response, ttl=3600):
+def set_cached_response(mcp_id, input_data, response, ttl=DEFAULT_TTL):
     """
     Caches an MCP response with a TTL.
     """
-    input_hash = _generate_input_hash(input_data)
-    cache_key = f"{mcp_id}:{input_hash}"
-    
-    _mcp_cache[cache_key] = {
-        'response': response,
-        'timestamp': time.time(),
-        'ttl': ttl
-    }
+    _store(build_cache_key(mcp_id, input_data), response, ttl, _mcp_max_stale.get(mcp_id, 0))
+
+async def fetch_once(mcp_id, input_data, fetch, ttl=DEFAULT_TTL):
+    """
+    Awaits fetch() to fill a cache miss, sharing one call across concurrent
+    callers for the same key, and caches the result.
+    """
+    cache_key = build_cache_key(mcp_id, input_data)
+    max_stale = _mcp_max_stale.get(mcp_id, 0)
+
+    async def load():
+        response = await fetch()
+        await _astore(cache_key, response, ttl, max_stale)
+        return response
+
+    return await _mcp_inflight.do(cache_key, load)
+
+async def get_or_fetch(mcp_id, input_data, fetch, ttl=DEFAULT_TTL, force_refresh=False):
+    """
+    Returns the cached response for an MCP, awaiting fetch() on a miss.
+
+    For MCPs with a stale window, an expired response still inside the window
+    is returned immediately and refreshed in a background task.
+    """
+    cache_key = build_cache_key(mcp_id, input_data)
+
+    if not force_refresh:
+        response, is_fresh = await _alookup(cache_key)
+        if response is not None:
+            if is_fresh:
+                logger.info(f"Cache hit for {mcp_id}")
+            else:
+                logger.info(f"Serving stale {mcp_id} response while it refreshes")
+                _refresh_in_background(mcp_id, input_data, fetch, ttl, cache_key)
+            return response
+
+    return await fetch_once(mcp_id, input_data, fetch, ttl)
+
+# Background refresh tasks, referenced so they are not garbage collected
+_background_refreshes = set()
+
+def _refresh_in_background(mcp_id, input_data, fetch, ttl, cache_key):
+    """
+    Starts a background refresh unless one is already running for the key.
+    """
+    if _mcp_inflight.is_running(cache_key):
+        return
+
+    async def refresh():
+        try:
+            await fetch_once(mcp_id, input_data, fetch, ttl)
+        except Exception as e:
+            logger.warning(f"Background refresh of {mcp_id} failed: {e}")
+
+    task = asyncio.ensure_future(refresh())
+    _background_refreshes.add(task)
+    task.add_done_callback(_background_refreshes.discard)
+
+def get_cache_stats():
+    """
+    Returns hit/miss/eviction counters and current size of the MCP cache.
+    """
+    stats = _mcp_cache.stats()
+    if _shared_tier is not None:
+        stats["shared"] = _shared_tier.stats()
+    return stats
+
+def clear_cache():
+    """
+    Drops every cached MCP response.
+    """
+    _mcp_cache.clear()
+    if _shared_tier is not None:
+        _shared_tier.clear()
+
+def save_snapshot(path=SNAPSHOT_PATH):
+    """
+    Writes every live cache entry to a gzipped JSON-lines file.
+
+    With the shared tier on, the snapshot is taken from it, so it holds the
+    host's whole working set rather than one worker's hot set. Workers
+    share the file; one writes at a time and the others skip, since they
+    would write the same entries. Expiry times are stored as absolute
+    timestamps so entries keep their remaining TTL when reloaded. The file
+    is replaced atomically. Returns the number of entries written.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with _snapshot_lock(path) as acquired:
+        if not acquired:
+            return 0
+
+        if _shared_tier is not None:
+            items = _shared_tier.live_items()
+        else:
+            items = [
+                (key, json.dumps(response, separators=(",", ":")), expires_at, stale_until)
+                for key, response, expires_at, stale_until in _mcp_cache.live_items()
+            ]
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=5) as f:
+            for key, payload, expires_at, stale_until in items:
+                # Payloads are already JSON; splice them in rather than re-encoding
+                f.write(f'{{"k":{json.dumps(key)},"v":{payload},"e":{expires_at!r},"s":{stale_until!r}}}\n')
+        os.replace(tmp_path, path)
+        return len(items)
+
+def load_snapshot(path=SNAPSHOT_PATH):
+    """
+    Reloads entries written by save_snapshot, skipping any that have expired
+    since. Returns the number of entries restored.
+
+    With the shared tier on, entries go into it once for the whole host:
+    a worker that finds another one already loading or saving skips, and
+    entries the shared tier already holds are kept.
+    """
+    if not os.path.exists(path):
+        return 0
+
+    items = []
+    now = time.time()
+    try:
+        with _snapshot_lock(path) as acquired:
+            if not acquired:
+                return 0
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    item = json.loads(line)
+                    if item["s"] > now:
+                        items.append(item)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Could not load cache snapshot from {path}: {e}")
+
+    if _shared_tier is not None:
+        _shared_tier.restore(
+            (item["k"], json.dumps(item["v"], separators=(",", ":")), item["e"], item["s"]) for item in items
+        )
+    else:
+        for item in items:
+            _store(item["k"], item["v"], item["e"] - now, item["s"] - item["e"])
+    return len(items)
+
+@contextmanager
+def _snapshot_lock(path):
+    """
+    Non-blocking exclusive lock shared by every worker using the snapshot.
+    Yields whether it was acquired.
+    """
+    with open(f"{path}.lock", "a") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def start_snapshots(interval=SNAPSHOT_INTERVAL, path=SNAPSHOT_PATH):
+    """
+    Saves a snapshot every `interval` seconds from a daemon thread.
+    """
+    if interval <= 0:
+        return
+
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                save_snapshot(path)
+            except OSError as e:
+                logger.warning(f"Could not save cache snapshot to {path}: {e}")
+
+    threading.Thread(target=run, name="mcp-cache-snapshot", daemon=True).start()
+
+def _lookup(cache_key):
+    """
+    Looks a key up in the process cache, then in the shared tier.
+
+    A shared-tier entry is copied into the process cache with its remaining
+    lifetime. The shared tier is also consulted when the local copy is stale,
+    since another worker may already have refreshed it.
+    """
+    response, is_fresh = _mcp_cache.lookup(cache_key)
+    if is_fresh or _shared_tier is None:
+        return response, is_fresh
+    return _merge_shared(cache_key, response, _shared_tier.get(cache_key))
+
+async def _alookup(cache_key):
+    """
+    _lookup for coroutines; the shared-tier read runs in a worker thread so
+    a busy database never blocks the event loop.
+    """
+    response, is_fresh = _mcp_cache.lookup(cache_key)
+    if is_fresh or _shared_tier is None:
+        return response, is_fresh
+    return _merge_shared(cache_key, response, await asyncio.to_thread(_shared_tier.get, cache_key))
+
+def _merge_shared(cache_key, response, shared):
+    """
+    Picks between a stale or missing local entry and the shared-tier entry.
+    """
+    if shared is None:
+        return response, False
+
+    shared_response, expires_at, stale_until = shared
+    now = time.time()
+    if response is not None and now >= expires_at:
+        return response, False
+
+    _mcp_cache.set(cache_key, shared_response, expires_at - now, stale_until - expires_at)
+    return shared_response, now < expires_at
+
+def _store(cache_key, response, ttl, max_stale):
+    """
+    Writes a response through to the process cache and the shared tier.
+    """
+    shared_entry = _store_local(cache_key, response, ttl, max_stale)
+    if shared_entry is not None:
+        _shared_tier.set(*shared_entry)
+
+async def _astore(cache_key, response, ttl, max_stale):
+    """
+    _store for coroutines; the shared-tier write runs in a worker thread.
+    """
+    shared_entry = _store_local(cache_key, response, ttl, max_stale)
+    if shared_entry is not None:
+        await asyncio.to_thread(_shared_tier.set, *shared_entry)
+
+def _store_local(cache_key, response, ttl, max_stale):
+    """
+    Stores a response in the process cache and returns the shared-tier
+    set() arguments, or None without a shared tier.
+    """
+    if _shared_tier is None:
+        _mcp_cache.set(cache_key, response, ttl, max_stale)
+        return None
+
+    payload = json.dumps(response, separators=(",", ":"))
+    now = time.time()
+    _mcp_cache.set(cache_key, response, ttl, max_stale, size=len(payload))
+    return cache_key, payload, now + ttl, now + ttl + max_stale
 
 def _generate_input_hash(input_data):
     """
-    Generates a SHA-256 hash of the input data.
+    Generates a 128-bit xxHash of the canonical form of the input data.
+    """
+    serialized_data = repr(_canonicalize(input_data)).encode('utf-8')
+    if xxhash is not None:
+        return xxhash.xxh3_128_hexdigest(serialized_data)
+    return hashlib.blake2b(serialized_data, digest_size=16).hexdigest()
+
+def _canonicalize(value):
+    """
+    Converts nested dicts/lists into hashable tuples with dict keys sorted, so
+    equal inputs always serialize identically.
     """
-    serialized_data = json.dumps(input_data, sort_keys=True).encode('utf-8')
-    return hashlib.sha256(serialized_data).hexdigest()
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _canonicalize(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_canonicalize(v) for v in value)
+    return value
 
-def _is_expired(cached_item):
+def _estimate_size(response):
     """
-    Checks if a cached item has expired.
+    Approximates the memory footprint of a response by its JSON length.
     """
-    elapsed_time = time.time() - cached_item['timestamp']
-    return elapsed_time > cached_item['ttl']
\ No newline at end of file
+    try:
+        return len(json.dumps(response, separators=(",", ":")))
+    except (TypeError, ValueError):
+        return len(repr(response))
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+
+logger = logging.getLogger(__name__)
+
+MAX_ITINERARIES = 10000
+
+
+class ItineraryEngine:
+    """
+    Keeps a materialized itinerary per uid and patches it on field updates.
+
+    field_to_mcp_map is treated as a dependency graph: a changed field
+    invalidates exactly the MCP sections that depend on it, and only those
+    are recomputed. Everything else is served from the stored itinerary.
+
+    A section whose MCP fails keeps its previous value and is retried on the
+    uid's next update or build.
+    """
+
+    def __init__(self, field_to_mcp_map, trip_fields, run_mcps, max_itineraries=MAX_ITINERARIES):
+        """
+        Args:
+            field_to_mcp_map: Trip field -> MCPs that depend on it.
+            trip_fields: Trip field -> trip_details keys holding its value.
+            run_mcps: async (mcp_names, trip_details, force_enrich) -> results by MCP name;
+                a failed MCP's result is {"error": ...}.
+            max_itineraries: Most itineraries kept; least recently used go first.
+        """
+        self.field_to_mcp_map = field_to_mcp_map
+        self.trip_fields = trip_fields
+        self.run_mcps = run_mcps
+        self.max_itineraries = max_itineraries
+        self.all_mcps = sorted({mcp for mcps in field_to_mcp_map.values() for mcp in mcps})
+        self._itineraries = OrderedDict()
+        # uid -> MCP sections whose last run failed
+        self._failed = {}
+        # uid -> [lock, number of coroutines using it]
+        self._locks = {}
+
+    def invalidated_by(self, fields):
+        """
+        Returns the MCP sections that depend on any of the given fields.
+        """
+        return sorted({mcp for field in fields for mcp in self.field_to_mcp_map.get(field, [])})
+
+    def field_values(self, field, value):
+        """
+        Maps a field's new value onto the trip_details keys that hold it.
+
+        Multi-key fields (e.g. travel_dates) take a dict of their keys.
+        """
+        if value is None:
+            return {}
+
+        keys = self.trip_fields.get(field, [field])
+        if isinstance(value, dict):
+            return {key: value[key] for key in keys if key in value}
+        return {keys[0]: value}
+
+    def get(self, uid):
+        itinerary = self._itineraries.get(uid)
+        if itinerary is not None:
+            self._itineraries.move_to_end(uid)
+        return itinerary
+
+    def pending(self, uid):
+        """
+        Returns the sections of a uid's itinerary that still need recomputing.
+        """
+        return sorted(self._failed.get(uid, ()))
+
+    async def build(self, uid, trip_details, force_enrich=False):
+        """
+        Computes every section from scratch and stores the result.
+        """
+        async with self._lock(uid):
+            itinerary, _ = await self._recompute(uid, self.get(uid), self.all_mcps, trip_details, force_enrich)
+            return itinerary
+
+    async def apply_update(self, uid, field, trip_details, force_enrich=False):
+        """
+        Recomputes only the sections a field update invalidates, plus any
+        that failed last time, from the already-updated trip_details.
+
+        Returns (itinerary, recomputed MCP names). Without a stored itinerary
+        for the uid, every section is computed.
+        """
+        async with self._lock(uid):
+            itinerary = self.get(uid)
+            if itinerary is None:
+                stale = self.all_mcps
+            else:
+                stale = sorted(set(self.invalidated_by([field])) | self._failed.get(uid, set()))
+            if not stale:
+                return itinerary, []
+
+            logger.info(f"Field '{field}' invalidates {stale} for UID: {uid}")
+            return await self._recompute(uid, itinerary, stale, trip_details, force_enrich)
+
+    async def _recompute(self, uid, itinerary, stale, trip_details, force_enrich):
+        sections = await self.run_mcps(stale, trip_details, force_enrich)
+
+        # Failed sections keep their previous value and stay pending
+        updated = {mcp: result for mcp, result in sections.items() if not _is_failure(result)}
+        failed = set(self._failed.get(uid, ())) - set(updated)
+        failed.update(mcp for mcp in sections if mcp not in updated)
+        if failed:
+            logger.warning(f"Sections {sorted(failed)} failed for UID: {uid}; keeping previous values")
+            self._failed[uid] = failed
+        else:
+            self._failed.pop(uid, None)
+
+        patched = dict(itinerary or {})
+        patched.update(updated)
+        self._store(uid, patched)
+        return patched, list(updated)
+
+    @asynccontextmanager
+    async def _lock(self, uid):
+        # Serializes updates per uid so concurrent patches are not lost. The
+        # lock is dropped once no coroutine is using it.
+        entry = self._locks.get(uid)
+        if entry is None:
+            entry = self._locks[uid] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[uid]
+
+    def _store(self, uid, itinerary):
+        self._itineraries[uid] = itinerary
+        self._itineraries.move_to_end(uid)
+        while len(self._itineraries) > self.max_itineraries:
+            evicted_uid, _ = self._itineraries.popitem(last=False)
+            self._failed.pop(evicted_uid, None)
+
+
+def _is_failure(result):
+    return isinstance(result, dict) and "error" in result
@@ -0,0 +1,64 @@
+import os
+
+import httpx
+
+DEFAULT_TIMEOUT = float(os.getenv("MCP_TIMEOUT", 10.0))
+DEFAULT_MAX_CONNECTIONS = int(os.getenv("MCP_MAX_CONNECTIONS", 20))
+DEFAULT_MAX_KEEPALIVE = int(os.getenv("MCP_MAX_KEEPALIVE", 10))
+
+
+class MCPClientPool:
+    """
+    Pooled async HTTP clients for the MCP service registry.
+
+    Each service gets its own keep-alive connection pool, so connection limits
+    and timeouts apply per service and a slow MCP cannot starve the others.
+    Clients are created lazily, inside the worker's event loop.
+    """
+
+    def __init__(self, services, service_limits=None):
+        """
+        Args:
+            services: MCP name -> base URL.
+            service_limits: MCP name -> overrides for "timeout",
+                "max_connections" and "max_keepalive".
+        """
+        self.services = services
+        self.service_limits = service_limits or {}
+        self._clients = {}
+
+    def client(self, mcp_name):
+        client = self._clients.get(mcp_name)
+        if client is None:
+            limits = self.service_limits.get(mcp_name, {})
+            client = httpx.AsyncClient(
+                base_url=self.services[mcp_name],
+                timeout=httpx.Timeout(limits.get("timeout", DEFAULT_TIMEOUT), connect=2.0),
+                limits=httpx.Limits(
+                    max_connections=limits.get("max_connections", DEFAULT_MAX_CONNECTIONS),
+                    max_keepalive_connections=limits.get("max_keepalive", DEFAULT_MAX_KEEPALIVE),
+                ),
+            )
+            self._clients[mcp_name] = client
+        return client
+
+    async def post(self, mcp_name, payload, params=None):
+        """
+        Posts a payload to an MCP and returns its JSON response.
+
+        Raises:
+            httpx.HTTPError: If the request fails, returns an error status or
+                returns a body that is not JSON.
+        """
+        response = await self.client(mcp_name).post("/", json=payload, params=params)
+        response.raise_for_status()
+        try:
+            return response.json()
+        except ValueError as e:
+            # e.g. an HTML error page from a proxy served with a 200
+            raise httpx.DecodingError(f"{mcp_name} returned a non-JSON response: {e}", request=response.request) from e
+
+    async def aclose(self):
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
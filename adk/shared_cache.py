@@ -0,0 +1,179 @@
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Put the shared tier on tmpfs when available so it is effectively a shared
+# memory segment; every worker process on the host opens the same file.
+_default_dir = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+SHARED_CACHE_PATH = os.getenv("MCP_SHARED_CACHE_PATH", os.path.join(_default_dir, "driftaway_mcp_cache.sqlite"))
+SHARED_CACHE_MAX_ENTRIES = int(os.getenv("MCP_SHARED_CACHE_MAX_ENTRIES", 20000))
+# Seconds to wait on another worker's write lock before treating the
+# operation as a miss; a cache must never be slower than the MCP it fronts.
+SHARED_CACHE_BUSY_TIMEOUT = float(os.getenv("MCP_SHARED_CACHE_BUSY_TIMEOUT", 0.05))
+
+# Expired rows are purged and the entry cap enforced once every this many writes
+_PURGE_EVERY = 256
+
+
+class SharedCacheTier:
+    """
+    Host-wide cache tier shared by every worker process.
+
+    Backed by a SQLite database in WAL mode, memory-mapped and kept on tmpfs,
+    so one worker's MCP response serves all of them without an external
+    service. Every operation fails soft: a database error is logged and
+    treated as a miss.
+    """
+
+    def __init__(self, path=SHARED_CACHE_PATH, max_entries=SHARED_CACHE_MAX_ENTRIES,
+                 busy_timeout=SHARED_CACHE_BUSY_TIMEOUT):
+        self.path = path
+        self.max_entries = max_entries
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._writes = 0
+        self._stats_lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "errors": 0}
+
+    def get(self, key):
+        """
+        Returns (response, expires_at, stale_until) for a live entry, else None.
+        """
+        try:
+            row = self._connection().execute(
+                "SELECT value, expires_at, stale_until FROM mcp_cache WHERE key = ? AND stale_until > ?",
+                (key, time.time()),
+            ).fetchone()
+        except sqlite3.Error as e:
+            self._record_error("read", e)
+            return None
+
+        self._count("hits" if row else "misses")
+        if row is None:
+            return None
+        value, expires_at, stale_until = row
+        return json.loads(value), expires_at, stale_until
+
+    def set(self, key, payload, expires_at, stale_until):
+        """
+        Stores an already JSON-encoded response.
+        """
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO mcp_cache (key, value, expires_at, stale_until, stored_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, payload, expires_at, stale_until, time.time()),
+                )
+            with self._stats_lock:
+                self._writes += 1
+                purge_due = self._writes % _PURGE_EVERY == 0
+            if purge_due:
+                self.purge()
+        except sqlite3.Error as e:
+            self._record_error("write", e)
+
+    def delete(self, key):
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM mcp_cache WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            self._record_error("delete", e)
+
+    def clear(self):
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM mcp_cache")
+        except sqlite3.Error as e:
+            self._record_error("clear", e)
+
+    def purge(self):
+        """
+        Drops entries past their stale window, then the oldest entries beyond
+        max_entries.
+        """
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM mcp_cache WHERE stale_until <= ?", (time.time(),))
+                (count,) = conn.execute("SELECT COUNT(*) FROM mcp_cache").fetchone()
+                if count > self.max_entries:
+                    conn.execute(
+                        "DELETE FROM mcp_cache WHERE key IN "
+                        "(SELECT key FROM mcp_cache ORDER BY stored_at LIMIT ?)",
+                        (count - self.max_entries,),
+                    )
+        except sqlite3.Error as e:
+            self._record_error("purge", e)
+
+    def live_items(self):
+        """
+        Returns (key, payload, expires_at, stale_until) for every entry that
+        can still be served, oldest first. Payloads stay JSON-encoded.
+        """
+        try:
+            return self._connection().execute(
+                "SELECT key, value, expires_at, stale_until FROM mcp_cache WHERE stale_until > ? ORDER BY stored_at",
+                (time.time(),),
+            ).fetchall()
+        except sqlite3.Error as e:
+            self._record_error("read", e)
+            return []
+
+    def restore(self, items):
+        """
+        Bulk-inserts (key, payload, expires_at, stale_until) rows. Keys already
+        present are kept, since they are at least as recent as a snapshot.
+        """
+        now = time.time()
+        try:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO mcp_cache (key, value, expires_at, stale_until, stored_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    ((key, payload, expires_at, stale_until, now) for key, payload, expires_at, stale_until in items),
+                )
+        except sqlite3.Error as e:
+            self._record_error("restore", e)
+
+    def stats(self):
+        with self._stats_lock:
+            return {**self._stats, "path": self.path, "max_entries": self.max_entries}
+
+    def _connection(self):
+        # Connections are per thread and per process: a connection inherited
+        # across a gunicorn fork must not be reused by the child.
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("PRAGMA mmap_size=268435456")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS mcp_cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL, "
+                "stale_until REAL NOT NULL, stored_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS mcp_cache_stale_until ON mcp_cache (stale_until)")
+            conn.isolation_level = ""
+            local.conn = conn
+            local.pid = os.getpid()
+        return local.conn
+
+    def _count(self, name):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def _record_error(self, operation, error):
+        self._count("errors")
+        logger.warning(f"Shared cache {operation} failed: {error}")
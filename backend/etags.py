@@ -0,0 +1,10 @@
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    If-None-Match check; uses weak comparison as RFC 9110 requires.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
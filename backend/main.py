@@ -1,8 +1,9 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.staticfiles import StaticFiles
-from starlette.responses import FileResponse
+import asyncio
+import json
+from fastapi import FastAPI, HTTPException, Query, Request
+from starlette.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import Dict, Any, List, Optional
 
 # ONLY import the weather route for now
 from mcps.weather import weather_route
@@ -15,19 +16,19 @@ from mcps.activities import activities_route
 from mcps import itinerary
 from mcps.budget import budget_route
 from adk import adk_agent
+from static_assets import StaticAssets
 
 app = FastAPI()
 
 # --- Pydantic Models ---
-class ChatMessage(BaseModel):
-    role: str
-    content: str
-
 class ChatRequest(BaseModel):
     uid: str
     destination: str
     message: str
-    session_history: List[ChatMessage]
+    # Omit to start a new session; the response carries its id
+    session_id: Optional[str] = None
+    # Sent only by frontend builds that predate server-side sessions
+    session_history: Optional[List[Dict[str, Any]]] = None
 
 # --- Routers ---
 # ONLY include the weather router for now
@@ -42,7 +43,15 @@ app.include_router(budget_route.router, prefix="/api/budget")
 app.include_router(itinerary.router, prefix="/api/itinerary")
 
 # --- Static Files ---
-app.mount("/assets", StaticFiles(directory="static_build/assets"), name="assets")
+# The built frontend is held in memory with precompressed variants
+frontend = StaticAssets("static_build")
+
+@app.api_route("/assets/{path:path}", methods=["GET", "HEAD"])
+async def serve_asset(path: str, request: Request):
+    asset = frontend.get(f"assets/{path}")
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return frontend.response(asset, request.headers)
 
 # --- Endpoints ---
 # Comment out the chat endpoint for now
@@ -51,21 +60,67 @@ async def chat_endpoint(request: ChatRequest) -> Dict[str, Any]:
     """
     Endpoint to handle chatbot conversations.
     Connects to the ADK agent to get a conversational response.
+
+    History is kept server side per uid and session id, so clients send only
+    the new message and receive only the messages added by this turn.
     """
     try:
-        # Convert Pydantic models to simple dicts for the agent
-        session_history_dicts = [msg.dict() for msg in request.session_history]
-
-        response = adk_agent.chat(
+        # The agent call is blocking; keep it off the event loop
+        response = await asyncio.to_thread(
+            adk_agent.chat,
             uid=request.uid,
             destination=request.destination,
             message=request.message,
-            session_history=session_history_dicts
+            session_id=request.session_id,
+            session_history=request.session_history
         )
         return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _ndjson_chat_events(request: ChatRequest):
+    """
+    Encodes the agent's chat events as NDJSON lines. Starlette iterates this
+    generator in its threadpool, so the blocking agent never runs on the
+    event loop.
+    """
+    try:
+        for event in adk_agent.chat_stream(
+            uid=request.uid,
+            destination=request.destination,
+            message=request.message,
+            session_id=request.session_id
+        ):
+            yield json.dumps(event) + "\n"
+    except Exception as e:
+        yield json.dumps({"error": str(e)}) + "\n"
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    """
+    Streams the assistant's reply as NDJSON while the agent generates it:
+    a session_id line, one delta line per token, then a done line with the
+    full message.
+    """
+    return StreamingResponse(
+        _ndjson_chat_events(request),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/chat/history")
+async def chat_history(uid: str = Query(...), session_id: str = Query(...)) -> Dict[str, Any]:
+    """
+    Returns the summary and recent messages of a chat session.
+    """
+    history = adk_agent.get_session_history(uid, session_id)
+    if history is None:
+        raise HTTPException(status_code=404, detail="Chat session not found.")
+    return history
+
 @app.get("/{catchall:path}")
-async def serve_frontend(catchall: str):
-    return FileResponse("static_build/index.html")
\ No newline at end of file
+async def serve_frontend(catchall: str, request: Request):
+    # Top-level build files (e.g. vite.svg) are served as-is; every other
+    # path is a client-side route and gets index.html
+    asset = frontend.get(catchall) or frontend.index
+    return frontend.response(asset, request.headers)
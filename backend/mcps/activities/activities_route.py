@@ -1,5 +1,9 @@
+import hashlib
+import json
 import logging
+import re
 from fastapi import APIRouter
+from fastapi.responses import Response
 from pydantic import BaseModel
 
 # Configure logging
@@ -8,6 +12,110 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+MOCK_ACTIVITIES_TEMPLATE = {
+    "itinerary": [
+        {
+            "day": "Day 1",
+            "date": "2025-09-26", # Using today's date as a placeholder
+            "activities": [
+                {
+                    "id": "activity_1",
+                    "name": "Eiffel Tower",
+                    "type": "Landmark",
+                    "location": "Paris",
+                    "rating": 4.8,
+                    "reviewCount": 150000,
+                    "imageUrl": "https://www.mockdata.com/eiffel-tower.jpg",
+                    "tags": ["Iconic", "View", "Photography"],
+                    "reason": "A must-see landmark with breathtaking views of Paris."
+                },
+                {
+                    "id": "activity_2",
+                    "name": "Louvre Museum",
+                    "type": "Museum",
+                    "location": "Paris",
+                    "rating": 4.7,
+                    "reviewCount": 120000,
+                    "imageUrl": "https://www.mockdata.com/louvre-museum.jpg",
+                    "tags": ["Art", "Culture", "History"],
+                    "reason": "Home to thousands of works of art, including the Mona Lisa."
+                },
+                {
+                    "id": "activity_3",
+                    "name": "Notre Dame Cathedral",
+                    "type": "Cathedral",
+                    "location": "Paris",
+                    "rating": 4.6,
+                    "reviewCount": 90000,
+                    "imageUrl": "https://www.mockdata.com/notre-dame.jpg",
+                    "tags": ["Architecture", "History", "Religious"],
+                    "reason": "A stunning example of French Gothic architecture."
+                },
+                {
+                    "id": "activity_4",
+                    "name": "Seine River Cruise",
+                    "type": "Tour",
+                    "location": "Paris",
+                    "rating": 4.5,
+                    "reviewCount": 75000,
+                    "imageUrl": "https://www.mockdata.com/seine-cruise.jpg",
+                    "tags": ["Relaxing", "Scenic", "Romantic"],
+                    "reason": "Enjoy panoramic views of Paris landmarks from the water."
+                }
+            ]
+        }
+    ],
+    "summary": "{summary}",
+    "location": "{location}"
+}
+
+
+_SLOT = re.compile(r'"\{(\w+)\}"')
+
+
+def _compile_template(template: dict) -> tuple[list, list]:
+    """
+    Encodes a payload once and splits it around its "{slot}" placeholders.
+
+    Returns (parts, slots) with len(parts) == len(slots) + 1.
+    """
+    pieces = _SLOT.split(json.dumps(template, ensure_ascii=False, separators=(",", ":")))
+    return pieces[0::2], pieces[1::2]
+
+
+# Compiled at import; requests only encode the per-request slot values
+_ACTIVITIES_PARTS, _ACTIVITIES_SLOTS = _compile_template(MOCK_ACTIVITIES_TEMPLATE)
+
+# Version of the template; a rendered result changes only with it or the destination
+MOCK_ACTIVITIES_VERSION = hashlib.blake2b("".join(_ACTIVITIES_PARTS).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _slot_values(destination: str) -> dict:
+    return {
+        "summary": f"Your adventure itinerary for {destination}.",
+        "location": destination,
+    }
+
+
+def render_activities(destination: str) -> bytes:
+    """
+    Renders the mock activity suggestions straight to JSON bytes.
+    """
+    values = _slot_values(destination)
+    out = [_ACTIVITIES_PARTS[0]]
+    for slot, part in zip(_ACTIVITIES_SLOTS, _ACTIVITIES_PARTS[1:]):
+        out.append(json.dumps(values[slot], ensure_ascii=False))
+        out.append(part)
+    return "".join(out).encode("utf-8")
+
+
+async def fetch_activities(destination: str) -> dict:
+    """
+    Returns the mock activity suggestions for a destination as a fresh dict,
+    decoded from the bytes the endpoint serves so both always agree.
+    """
+    return json.loads(render_activities(destination))
+
 class TripRequest(BaseModel):
     uid: str
     destination: str
@@ -19,61 +127,6 @@ async def get_activities(data: TripRequest):
     """
     logger.info(f"Received request for mock activity suggestions for UID: {data.uid}")
 
-    mock_activities = {
-        "itinerary": [
-            {
-                "day": "Day 1",
-                "date": "2025-09-26", # Using today's date as a placeholder
-                "activities": [
-                    {
-                        "id": "activity_1",
-                        "name": "Eiffel Tower",
-                        "type": "Landmark",
-                        "location": "Paris",
-                        "rating": 4.8,
-                        "reviewCount": 150000,
-                        "imageUrl": "https://www.mockdata.com/eiffel-tower.jpg",
-                        "tags": ["Iconic", "View", "Photography"],
-                        "reason": "A must-see landmark with breathtaking views of Paris."
-                    },
-                    {
-                        "id": "activity_2",
-                        "name": "Louvre Museum",
-                        "type": "Museum",
-                        "location": "Paris",
-                        "rating": 4.7,
-                        "reviewCount": 120000,
-                        "imageUrl": "https://www.mockdata.com/louvre-museum.jpg",
-                        "tags": ["Art", "Culture", "History"],
-                        "reason": "Home to thousands of works of art, including the Mona Lisa."
-                    },
-                    {
-                        "id": "activity_3",
-                        "name": "Notre Dame Cathedral",
-                        "type": "Cathedral",
-                        "location": "Paris",
-                        "rating": 4.6,
-                        "reviewCount": 90000,
-                        "imageUrl": "https://www.mockdata.com/notre-dame.jpg",
-                        "tags": ["Architecture", "History", "Religious"],
-                        "reason": "A stunning example of French Gothic architecture."
-                    },
-                    {
-                        "id": "activity_4",
-                        "name": "Seine River Cruise",
-                        "type": "Tour",
-                        "location": "Paris",
-                        "rating": 4.5,
-                        "reviewCount": 75000,
-                        "imageUrl": "https://www.mockdata.com/seine-cruise.jpg",
-                        "tags": ["Relaxing", "Scenic", "Romantic"],
-                        "reason": "Enjoy panoramic views of Paris landmarks from the water."
-                    }
-                ]
-            }
-        ],
-        "summary": f"Your adventure itinerary for {data.destination}.",
-        "location": data.destination
-    }
-
-    return mock_activities
\ No newline at end of file
+    body = render_activities(data.destination)
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
@@ -1,6 +1,8 @@
 import asyncio
+import itertools
 import logging
 import os
+import threading
 from typing import List, Dict, Any
 
 from fastmcp import FastMCP
@@ -10,9 +12,100 @@ logging.basicConfig(format="[%(levelname)s]: %(message)s", level=logging.INFO)
 
 mcp = FastMCP("Budget MCP Server 💰")
 
-# Mock budget data
-BUDGETS = {}
-EXPENSES = {}
+
+def _to_cents(amount: float) -> int:
+    return round(amount * 100)
+
+
+class BudgetAccount:
+    """
+    One budget with its expense index and running totals, kept in integer
+    cents so sums do not drift.
+    """
+
+    __slots__ = ("budget_id", "trip_id", "total_cents", "spent_cents", "by_category", "expense_ids", "lock")
+
+    def __init__(self, budget_id: str, trip_id: int | None, total_amount: float | None):
+        self.budget_id = budget_id
+        self.trip_id = trip_id
+        self.total_cents = _to_cents(total_amount) if total_amount is not None else None
+        self.spent_cents = 0
+        self.by_category = {}
+        self.expense_ids = []
+        self.lock = threading.Lock()
+
+
+class ExpenseLedger:
+    """
+    In-memory expense ledger.
+
+    Expense IDs come from a single atomic counter, so concurrent writers
+    never collide. Every budget keeps the IDs of its expenses and running
+    totals overall and per category, updated under its own lock, so writes
+    to different budgets do not contend and a summary never scans expenses.
+    """
+
+    def __init__(self):
+        self.budgets = {}
+        self.expenses = {}
+        self._expense_ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def create_budget(self, trip_id: int, total_amount: float) -> BudgetAccount:
+        budget_id = f"budget_{trip_id}"
+        account = self._account(budget_id, trip_id)
+        with account.lock:
+            account.trip_id = trip_id
+            account.total_cents = _to_cents(total_amount)
+        return account
+
+    def add_expense(self, budget_id: str, category: str, amount: float) -> str:
+        """
+        Records an expense and returns its ID. Expenses against a budget that
+        was never created open an account without a total.
+        """
+        expense_id = f"exp_{next(self._expense_ids)}"
+        cents = _to_cents(amount)
+        account = self._account(budget_id)
+        self.expenses[expense_id] = {"budget_id": budget_id, "category": category, "amount": amount}
+        with account.lock:
+            account.expense_ids.append(expense_id)
+            account.spent_cents += cents
+            account.by_category[category] = account.by_category.get(category, 0) + cents
+        return expense_id
+
+    def summary(self, budget_id: str) -> Dict[str, Any] | None:
+        account = self.budgets.get(budget_id)
+        if account is None:
+            return None
+
+        with account.lock:
+            total, spent = account.total_cents, account.spent_cents
+            by_category = {category: cents / 100 for category, cents in account.by_category.items()}
+            expense_count = len(account.expense_ids)
+
+        return {
+            "budget_id": budget_id,
+            "trip_id": account.trip_id,
+            "total_amount": total / 100 if total is not None else None,
+            "spent": spent / 100,
+            "remaining": (total - spent) / 100 if total is not None else None,
+            "by_category": by_category,
+            "expense_count": expense_count,
+        }
+
+    def _account(self, budget_id: str, trip_id: int | None = None) -> BudgetAccount:
+        account = self.budgets.get(budget_id)
+        if account is None:
+            with self._lock:
+                account = self.budgets.get(budget_id)
+                if account is None:
+                    account = self.budgets[budget_id] = BudgetAccount(budget_id, trip_id, None)
+        return account
+
+
+# In-memory budgets and expenses
+ledger = ExpenseLedger()
 
 @mcp.tool()
 def create_budget(trip_id: int, total_amount: float) -> Dict[str, Any]:
@@ -27,10 +120,9 @@ def create_budget(trip_id: int, total_amount: float) -> Dict[str, Any]:
         A dictionary with the created budget details.
     """
     logger.info(f">>> 🛠️ Tool: 'create_budget' called for trip ID '{trip_id}'")
-    budget_id = f"budget_{trip_id}"
-    BUDGETS[budget_id] = {"trip_id": trip_id, "total_amount": total_amount}
+    account = ledger.create_budget(trip_id, total_amount)
     return {
-        "budget_id": budget_id,
+        "budget_id": account.budget_id,
         "trip_id": trip_id,
         "total_amount": total_amount,
         "status": "created"
@@ -50,8 +142,7 @@ def add_expense(budget_id: str, category: str, amount: float) -> Dict[str, Any]:
         A dictionary with the added expense details.
     """
     logger.info(f">>> 🛠️ Tool: 'add_expense' called for budget ID '{budget_id}'")
-    expense_id = f"exp_{len(EXPENSES) + 1}"
-    EXPENSES[expense_id] = {"budget_id": budget_id, "category": category, "amount": amount}
+    expense_id = ledger.add_expense(budget_id, category, amount)
     return {
         "expense_id": expense_id,
         "budget_id": budget_id,
@@ -60,6 +151,24 @@ def add_expense(budget_id: str, category: str, amount: float) -> Dict[str, Any]:
         "status": "added"
     }
 
+@mcp.tool()
+def get_budget_summary(budget_id: str) -> Dict[str, Any]:
+    """
+    Summarizes a budget: total, amount spent and remaining, and spending per
+    category.
+
+    Args:
+        budget_id: The ID of the budget.
+
+    Returns:
+        A dictionary with the budget summary.
+    """
+    logger.info(f">>> 🛠️ Tool: 'get_budget_summary' called for budget ID '{budget_id}'")
+    summary = ledger.summary(budget_id)
+    if summary is None:
+        return {"budget_id": budget_id, "status": "not_found"}
+    return {**summary, "status": "ok"}
+
 if __name__ == "__main__":
     logger.info(f"🚀 MCP server started on port {os.getenv('PORT', 8082)}")
     asyncio.run(
@@ -1,5 +1,8 @@
+import hashlib
+import json
 import logging
 from fastapi import APIRouter
+from fastapi.responses import Response
 from pydantic import BaseModel
 
 # Configure logging
@@ -8,6 +11,26 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+MOCK_BUDGET = {
+    "budget": {
+        "total": 2000,
+        "currency": "USD",
+        "breakdown": [
+            {"category": "Flights", "amount": 800},
+            {"category": "Accommodation", "amount": 600},
+            {"category": "Food", "amount": 400},
+            {"category": "Activities", "amount": 200}
+        ]
+    }
+}
+
+# Encoded once at import; every request returns the same bytes
+_MOCK_BUDGET_BODY = json.dumps(MOCK_BUDGET, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+# Version of the provider result, also sent as its strong ETag
+MOCK_BUDGET_VERSION = hashlib.blake2b(_MOCK_BUDGET_BODY, digest_size=8).hexdigest()
+_MOCK_BUDGET_HEADERS = {"ETag": f'"{MOCK_BUDGET_VERSION}"'}
+
 class TripRequest(BaseModel):
     uid: str
     destination: str
@@ -19,17 +42,4 @@ async def get_budget_suggestions(data: TripRequest):
     """
     logger.info(f"Received request for mock budget suggestions for UID: {data.uid}")
 
-    mock_budget = {
-        "budget": {
-            "total": 2000,
-            "currency": "USD",
-            "breakdown": [
-                {"category": "Flights", "amount": 800},
-                {"category": "Accommodation", "amount": 600},
-                {"category": "Food", "amount": 400},
-                {"category": "Activities", "amount": 200}
-            ]
-        }
-    }
-
-    return mock_budget
+    return Response(content=_MOCK_BUDGET_BODY, media_type="application/json", headers=_MOCK_BUDGET_HEADERS)
@@ -1,6 +1,8 @@
 import asyncio
 import logging
 import os
+import re
+import unicodedata
 from typing import List, Dict, Any
 
 from fastmcp import FastMCP
@@ -52,13 +54,111 @@ CULTURE_DATA = {
             {"phrase": "What is your name?", "translation": "Tujem naum kitay?"},
         ],
     },
+    "Kerala": {
+        "etiquette": "Dress modestly and remove shoes at temples; some temples admit only Hindus. Use your right hand for eating and transactions.",
+        "languages": ["Malayalam", "English"],
+        "phrases": [
+            {"phrase": "Hello", "translation": "Namaskaram"},
+            {"phrase": "Thank you", "translation": "Nanni"},
+        ],
+    },
+    "India": {
+        "etiquette": "Greet with 'Namaste'. Dress modestly, especially at religious sites, and remove shoes before entering them. Use your right hand for eating and transactions.",
+        "languages": ["Hindi", "English"],
+        "phrases": [
+            {"phrase": "Hello", "translation": "Namaste"},
+            {"phrase": "Thank you", "translation": "Dhanyavaad"},
+            {"phrase": "How are you?", "translation": "Aap kaise hain?"},
+        ],
+    },
 }
 
+# Region hierarchy (city -> state -> country) used to fall back to the
+# nearest region that has cultural information.
+REGION_PARENTS = {
+    "Munnar, Kerala": "Kerala",
+    "Kochi, Kerala": "Kerala",
+    "Kerala": "India",
+    "Darjeeling, West Bengal": "West Bengal",
+    "Kolkata, West Bengal": "West Bengal",
+    "West Bengal": "India",
+    "Agra, Uttar Pradesh": "Uttar Pradesh",
+    "Varanasi, Uttar Pradesh": "Uttar Pradesh",
+    "Uttar Pradesh": "India",
+    "Goa": "India",
+}
+
+NOT_FOUND = {"etiquette": "Information not found.", "languages": [], "phrases": []}
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize_region_name(name: str) -> str:
+    """
+    Folds case, diacritics, punctuation and whitespace.
+    """
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_WORD.sub(" ", stripped.casefold()).strip()
+
+
+class CultureIndex:
+    """
+    Cultural information by region, with city -> state -> country fallback.
+
+    Each region is indexed under its normalized name and its name without
+    the parent ("Munnar"). The nearest ancestor with data is resolved once
+    per region when the index is built, so a lookup is a couple of dict
+    probes no matter how deep the hierarchy is.
+    """
+
+    def __init__(self, data: Dict[str, Dict[str, Any]], parents: Dict[str, str]):
+        self.data = data
+        regions = set(data) | set(parents) | set(parents.values())
+
+        self._resolved = {}
+        for region in regions:
+            node, seen = region, set()
+            while node is not None and node not in data and node not in seen:
+                seen.add(node)
+                node = parents.get(node)
+            if node in data:
+                self._resolved[region] = node
+
+        self._regions_by_key = {}
+        for region in sorted(regions, key=lambda name: (name.count(","), name)):
+            for key in (region, region.split(",")[0]):
+                self._regions_by_key.setdefault(normalize_region_name(key), region)
+
+    def resolve(self, place_name: str) -> str | None:
+        """
+        Returns the region whose information applies to a place, or None.
+
+        Tries the full name, then each comma-separated component from the
+        most specific ("Kochi, Kerala, India" -> "kochi", "kerala", ...).
+        """
+        keys = [place_name] + place_name.split(",")
+        for key in keys:
+            region = self._regions_by_key.get(normalize_region_name(key))
+            if region is not None and region in self._resolved:
+                return self._resolved[region]
+        return None
+
+    def lookup(self, place_name: str) -> Dict[str, Any]:
+        region = self.resolve(place_name)
+        if region is None:
+            return NOT_FOUND
+        return {**self.data[region], "region": region}
+
+
+culture_index = CultureIndex(CULTURE_DATA, REGION_PARENTS)
+
 
 @mcp.tool()
 def get_cultural_info(place_name: str) -> Dict[str, Any]:
     """
-    Gets cultural information for a specific place.
+    Gets cultural information for a specific place, falling back to its
+    state or country when the place itself is not covered.
 
     Args:
         place_name: The name of the place to get cultural information for.
@@ -67,9 +167,22 @@ def get_cultural_info(place_name: str) -> Dict[str, Any]:
         A dictionary with the cultural information.
     """
     logger.info(f">>> 🛠️ Tool: 'get_cultural_info' called for '{place_name}'")
-    return CULTURE_DATA.get(
-        place_name, {"etiquette": "Information not found.", "languages": [], "phrases": []}
-    )
+    return culture_index.lookup(place_name)
+
+
+@mcp.tool()
+def get_cultural_info_bulk(place_names: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Gets cultural information for every stop of a multi-city trip at once.
+
+    Args:
+        place_names: The names of the places on the trip.
+
+    Returns:
+        A dictionary mapping each place name to its cultural information.
+    """
+    logger.info(f">>> 🛠️ Tool: 'get_cultural_info_bulk' called for {len(place_names)} places")
+    return {place_name: culture_index.lookup(place_name) for place_name in dict.fromkeys(place_names)}
 
 if __name__ == "__main__":
     logger.info(f"🚀 MCP server started on port {os.getenv('PORT', 8083)}")
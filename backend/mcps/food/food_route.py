@@ -1,5 +1,8 @@
+import hashlib
+import json
 import logging
 from fastapi import APIRouter
+from fastapi.responses import Response
 from pydantic import BaseModel
 
 # Configure logging
@@ -8,6 +11,62 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+MOCK_FOOD = {
+    "cafes": [
+        {
+            "name": "The Daily Grind",
+            "cuisine": "Continental",
+            "priceRange": "$",
+            "rating": 4.2,
+            "location": "City Center",
+            "reason": "Great for a quick coffee and light bites.",
+            "url": "https://www.mockdata.com/maps/search/The+Daily+Grind"
+        },
+        {
+            "name": "Spice Route Cafe",
+            "cuisine": "Indian",
+            "priceRange": "$",
+            "rating": 4.5,
+            "location": "Old Town",
+            "reason": "Authentic local flavors in a cozy setting.",
+            "url": "https://www.mockdata.com/spice-route-cafe"
+        },
+        {
+            "name": "Green Leaf Bistro",
+            "cuisine": "Healthy",
+            "priceRange": "$",
+            "rating": 4.0,
+            "location": "Near Park",
+            "reason": "Fresh salads and organic options.",
+            "url": "https://www.mockdata.com/GreenLeafBistro"
+        },
+        {
+            "name": "Cafe Amore",
+            "cuisine": "Italian",
+            "priceRange": "$$",
+            "rating": 4.7,
+            "location": "Riverside",
+            "reason": "Romantic ambiance with delicious pasta.",
+            "url": "https://www.mockdata.com/maps/search/Cafe+Amore"
+        }
+    ]
+}
+
+# Encoded once at import; every request returns the same bytes
+_MOCK_FOOD_BODY = json.dumps(MOCK_FOOD, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+# Version of the provider result, also sent as its strong ETag
+MOCK_FOOD_VERSION = hashlib.blake2b(_MOCK_FOOD_BODY, digest_size=8).hexdigest()
+_MOCK_FOOD_HEADERS = {"ETag": f'"{MOCK_FOOD_VERSION}"'}
+
+
+async def fetch_food_suggestions(destination: str) -> dict:
+    """
+    Returns the mock food suggestions as a fresh dict, decoded from the bytes
+    the endpoint serves so both always agree.
+    """
+    return json.loads(_MOCK_FOOD_BODY)
+
 class TripRequest(BaseModel):
     uid: str
     destination: str
@@ -19,45 +78,4 @@ async def get_food_suggestions(data: TripRequest):
     """
     logger.info(f"Received request for mock food suggestions for UID: {data.uid}")
 
-    mock_food = {
-        "cafes": [
-            {
-                "name": "The Daily Grind",
-                "cuisine": "Continental",
-                "priceRange": "$",
-                "rating": 4.2,
-                "location": "City Center",
-                "reason": "Great for a quick coffee and light bites.",
-                "url": "https://www.mockdata.com/maps/search/The+Daily+Grind"
-            },
-            {
-                "name": "Spice Route Cafe",
-                "cuisine": "Indian",
-                "priceRange": "$",
-                "rating": 4.5,
-                "location": "Old Town",
-                "reason": "Authentic local flavors in a cozy setting.",
-                "url": "https://www.mockdata.com/spice-route-cafe"
-            },
-            {
-                "name": "Green Leaf Bistro",
-                "cuisine": "Healthy",
-                "priceRange": "$",
-                "rating": 4.0,
-                "location": "Near Park",
-                "reason": "Fresh salads and organic options.",
-                "url": "https://www.mockdata.com/GreenLeafBistro"
-            },
-            {
-                "name": "Cafe Amore",
-                "cuisine": "Italian",
-                "priceRange": "$$",
-                "rating": 4.7,
-                "location": "Riverside",
-                "reason": "Romantic ambiance with delicious pasta.",
-                "url": "https://www.mockdata.com/maps/search/Cafe+Amore"
-            }
-        ]
-    }
-
-    return mock_food
+    return Response(content=_MOCK_FOOD_BODY, media_type="application/json", headers=_MOCK_FOOD_HEADERS)
@@ -1,7 +1,14 @@
 import asyncio
+import bisect
+import heapq
+import itertools
 import logging
+import math
 import os
-from typing import Dict, Any
+import re
+import unicodedata
+from functools import lru_cache
+from typing import List, Dict, Any
 
 from fastmcp import FastMCP
 
@@ -74,11 +81,436 @@ GEOCODE_DATA = {
     }
 }
 
+# Alternate and historical names, keyed by GEOCODE_DATA entry
+PLACE_ALIASES = {
+    "Darjeeling, West Bengal": ["Darjiling", "Dorje Ling"],
+    "Agra, Uttar Pradesh": ["Akbarabad"],
+    "Goa": ["Gomantak", "Goa State"],
+}
+
+ZERO_RESULTS = {"results": [], "status": "ZERO_RESULTS"}
+INVALID_REQUEST = {"results": [], "status": "INVALID_REQUEST"}
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+# Leading characters of each key covered by the two-edit deletion index;
+# longer prefixes mean fewer candidates to verify but a larger index
+FUZZY_PREFIX = 7
+
+
+def normalize_place_name(name: str) -> str:
+    """
+    Folds case, diacritics, punctuation and whitespace, so "Goa, India",
+    "goa india" and "GOA  India" share one key.
+    """
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_WORD.sub(" ", stripped.casefold()).strip()
+
+
+def _max_edits(query: str) -> int:
+    # Short names tolerate fewer typos before matching unrelated places
+    if len(query) < 4:
+        return 0
+    return 1 if len(query) < 8 else 2
+
+
+def _deletions(word: str, max_edits: int) -> set:
+    """
+    The word and every string left after deleting up to max_edits of its
+    characters.
+    """
+    found = frontier = {word}
+    for _ in range(max_edits):
+        frontier = {part[:i] + part[i + 1:] for part in frontier for i in range(len(part))}
+        found = found | frontier
+    return found
+
+
+def _char_counts(word: str) -> int:
+    """
+    The word's character histogram packed into an int: 32 buckets of four
+    bits, each holding its count (capped at four) in unary.
+
+    (a & ~b).bit_count() is then at most the number of characters of a that
+    b lacks, which one edit raises by at most one.
+    """
+    counts = {}
+    for char in word:
+        bucket = ord(char) % 32
+        counts[bucket] = min(counts.get(bucket, 0) + 1, 4)
+    packed = 0
+    for bucket, count in counts.items():
+        packed |= ((1 << count) - 1) << (bucket * 4)
+    return packed
+
+
+def _edit_distance(a: str, b: str, max_edits: int) -> int:
+    """
+    Levenshtein distance of a and b, or max_edits + 1 once it is known to
+    exceed max_edits.
+
+    Uses the bit-parallel algorithm of Myers (in Hyyrö's formulation for
+    edit distance): a whole column of the table is packed into an int, so
+    each character of b costs a handful of integer operations.
+    """
+    if len(a) > len(b):
+        a, b = b, a
+    cap = max_edits + 1
+    if len(b) - len(a) > max_edits:
+        return cap
+
+    # Matching ends never change the distance
+    start = 0
+    while start < len(a) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < len(a) - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a, b = a[start:len(a) - end], b[start:len(b) - end]
+    if not a:
+        return min(len(b), cap)
+
+    positions = {}
+    for i, char in enumerate(a):
+        positions[char] = positions.get(char, 0) | 1 << i
+    full = (1 << len(a)) - 1
+    last = 1 << (len(a) - 1)
+    plus, minus, distance = full, 0, len(a)
+    for column, char in enumerate(b, 1):
+        match = positions.get(char, 0)
+        vertical = match | minus
+        horizontal = (((match & plus) + plus) ^ plus) | match
+        up = minus | ~(horizontal | plus)
+        down = plus & horizontal
+        if up & last:
+            distance += 1
+        elif down & last:
+            distance -= 1
+        if distance - (len(b) - column) > max_edits:
+            # Each remaining character lowers the distance by at most one
+            return cap
+        up = up << 1 | 1
+        plus = (down << 1 | ~(vertical | up)) & full
+        minus = up & vertical & full
+    return min(distance, cap)
+
+
+def _one_edit_variants(word: str, alphabet: List[str]) -> set:
+    """
+    Every string one deletion, substitution or insertion away from the word.
+    """
+    splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+    variants = {left + right[1:] for left, right in splits if right}
+    variants.update(left + char + right[1:] for left, right in splits if right for char in alphabet)
+    variants.update(left + char + right for left, right in splits for char in alphabet)
+    variants.discard(word)
+    return variants
+
+
+class GeocodeIndex:
+    """
+    Forward geocoding index over a place catalog.
+
+    Every place is indexed under its normalized name, the name without its
+    region ("Munnar"), its formatted addresses ("Goa, India") and any
+    aliases. Exact lookups go through a dict and prefix lookups bisect the
+    keys kept in sorted order. Two-edit fuzzy lookups go through a deletion
+    index over key prefixes (see _fuzzy), which costs about 3 KB per place
+    and around 15 seconds of startup per 100k places.
+    """
+
+    def __init__(self, places: Dict[str, Dict[str, Any]], aliases: Dict[str, List[str]] | None = None, cache_size: int = 4096):
+        self.places = places
+        self._names_by_key = {}
+        for name, response in places.items():
+            keys = [name, name.split(",")[0]]
+            keys += [result["formatted_address"] for result in response.get("results", [])]
+            keys += (aliases or {}).get(name, [])
+            for key in keys:
+                names = self._names_by_key.setdefault(normalize_place_name(key), [])
+                if name not in names:
+                    names.append(name)
+
+        self._keys = sorted(key for key in self._names_by_key if key)
+        self._alphabet = sorted(set("".join(self._keys)))
+
+        # Keys are grouped by length and first FUZZY_PREFIX characters, with
+        # group ids in length order. Each deletion of up to two characters from
+        # a prefix maps to the sorted ids of its groups, so a query can slice
+        # out the groups of the lengths it can match.
+        self._groups = []
+        self._first_group_by_length = []
+        ids_by_prefix = {}
+        entries = sorted((len(key), key[:FUZZY_PREFIX], key) for key in self._keys)
+        for (length, prefix), group in itertools.groupby(entries, key=lambda entry: entry[:2]):
+            group_id = len(self._groups)
+            while len(self._first_group_by_length) <= length:
+                self._first_group_by_length.append(group_id)
+            ids_by_prefix.setdefault(prefix, []).append(group_id)
+            self._groups.append(tuple((_char_counts(key), key) for _, _, key in group))
+        self._first_group_by_length.append(len(self._groups))
+
+        self._groups_by_deletion = {}
+        for prefix, ids in ids_by_prefix.items():
+            for deletion in _deletions(prefix, 2):
+                self._groups_by_deletion.setdefault(deletion, []).extend(ids)
+        # Tuples of ints drop out of the garbage collector's tracking, so its
+        # full passes don't walk the whole index
+        for deletion, ids in self._groups_by_deletion.items():
+            self._groups_by_deletion[deletion] = tuple(sorted(ids))
+
+        self.lookup = lru_cache(maxsize=cache_size)(self._lookup)
+
+    def _lookup(self, place_name: str) -> Dict[str, Any]:
+        """
+        Resolves a place name to its geocode response.
+
+        Tries the normalized name, then its first component ("Munnar, India"
+        -> "munnar"), then the same two with typos allowed. Fuzzy matches are
+        flagged with "partial_match" as the Geocoding API does.
+        """
+        query = normalize_place_name(place_name)
+        head = normalize_place_name(place_name.split(",")[0])
+        candidates = list(dict.fromkeys(key for key in (query, head) if key))
+
+        for key in candidates:
+            names = self._names_by_key.get(key)
+            if names:
+                return self._response(names)
+
+        for key in candidates:
+            names = self._fuzzy(key, _max_edits(key))
+            if names:
+                return self._response(names, partial_match=True)
+
+        return ZERO_RESULTS
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """
+        Returns up to `limit` catalog names whose keys start with the prefix.
+        """
+        prefix = normalize_place_name(prefix)
+        if not prefix:
+            return []
+
+        names = []
+        keys = self._keys
+        i = bisect.bisect_left(keys, prefix)
+        while i < len(keys) and keys[i].startswith(prefix) and len(names) < limit:
+            names.extend(name for name in self._names_by_key[keys[i]] if name not in names)
+            i += 1
+        return names[:limit]
+
+    def _fuzzy(self, query: str, max_edits: int) -> List[str]:
+        """
+        Returns the names of the closest keys within max_edits (Levenshtein).
+
+        One-edit matches are found by generating the query's edit
+        neighbourhood over the catalog alphabet and probing the key dict.
+
+        Two-edit matches come from the deletion index: when two strings are
+        within k edits, deleting at most k characters from each of their
+        FUZZY_PREFIX-character prefixes leaves a common string. Every key
+        prefix is indexed under its deletions of up to two characters, so
+        probing the deletions of the query's prefix finds every candidate.
+        Candidates are then filtered by length and character counts before
+        the distance check.
+        """
+        if max_edits == 0:
+            return []
+        if max_edits == 1:
+            return self._names_within_one_edit(query)
+
+        first_group = self._first_group_by_length
+        low = first_group[min(max(len(query) - max_edits, 0), len(first_group) - 1)]
+        high = first_group[min(len(query) + max_edits + 1, len(first_group) - 1)]
+        # Groups reached with fewer deletions from the query come first; they
+        # tend to be closer, and only the closest keys are returned, so the
+        # bound tightens as they are found
+        group_ids = {}
+        for deletion in sorted(_deletions(query[:FUZZY_PREFIX], max_edits), key=len, reverse=True):
+            ids = self._groups_by_deletion.get(deletion)
+            if ids:
+                group_ids.update(dict.fromkeys(ids[bisect.bisect_left(ids, low):bisect.bisect_left(ids, high)]))
+
+        counts = _char_counts(query)
+        distances = {}
+        for group_id in group_ids:
+            for key_counts, key in self._groups[group_id]:
+                if (counts & ~key_counts).bit_count() > max_edits or (key_counts & ~counts).bit_count() > max_edits:
+                    continue
+                distance = _edit_distance(query, key, max_edits)
+                if distance <= max_edits:
+                    distances[key] = distance
+                    max_edits = distance
+
+        if not distances:
+            return []
+        closest = min(distances.values())
+        return self._names_of(sorted(key for key, distance in distances.items() if distance == closest))
+
+    def _names_within_one_edit(self, query: str) -> List[str]:
+        candidates = _one_edit_variants(query, self._alphabet)
+        return self._names_of(sorted(key for key in candidates if key in self._names_by_key))
+
+    def _names_of(self, keys: List[str]) -> List[str]:
+        names = []
+        for key in keys:
+            names.extend(name for name in self._names_by_key[key] if name not in names)
+        return names
+
+    def _response(self, names: List[str], partial_match: bool = False) -> Dict[str, Any]:
+        if len(names) == 1 and not partial_match:
+            return self.places[names[0]]
+
+        results = [result for name in names for result in self.places[name]["results"]]
+        if partial_match:
+            results = [{**result, "partial_match": True} for result in results]
+        return {"results": results, "status": "OK"}
+
+
+geocode_index = GeocodeIndex(GEOCODE_DATA, PLACE_ALIASES)
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def _unit_vector(lat: float, lng: float) -> tuple:
+    lat, lng = math.radians(lat), math.radians(lng)
+    return (math.cos(lat) * math.cos(lng), math.cos(lat) * math.sin(lng), math.sin(lat))
+
+
+def _chord_to_km(chord: float) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+def _km_to_chord(km: float) -> float:
+    return 2 * math.sin(min(km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+class SpatialIndex:
+    """
+    k-d tree over places for reverse geocoding and radius search.
+
+    Points are stored as unit vectors on the sphere, so straight-line
+    (chord) distance orders places exactly as great-circle distance does,
+    with no special cases at the poles or the antimeridian. The tree is a
+    balanced, array-backed 3-d tree; queries visit O(log n) nodes on
+    typical data.
+    """
+
+    def __init__(self, places: Dict[str, Dict[str, Any]]):
+        points = []
+        for name, response in places.items():
+            for result in response.get("results", []):
+                location = result["geometry"]["location"]
+                points.append((_unit_vector(location["lat"], location["lng"]), name, result))
+
+        self._points = []
+        self._left = []
+        self._right = []
+        self._root = self._build(points, 0)
+
+    def _build(self, points: list, depth: int) -> int:
+        if not points:
+            return -1
+        axis = depth % 3
+        points.sort(key=lambda point: point[0][axis])
+        middle = len(points) // 2
+
+        node = len(self._points)
+        self._points.append(points[middle])
+        self._left.append(-1)
+        self._right.append(-1)
+        self._left[node] = self._build(points[:middle], depth + 1)
+        self._right[node] = self._build(points[middle + 1:], depth + 1)
+        return node
+
+    def nearest(self, lat: float, lng: float, count: int = 1) -> List[tuple]:
+        """
+        Returns up to `count` (distance_km, name, result), nearest first.
+        """
+        target = _unit_vector(lat, lng)
+        best = []  # max-heap of (-squared distance, node)
+        self._search(target, count, best)
+        return self._results(sorted((-neg, node) for neg, node in best))
+
+    def within(self, lat: float, lng: float, radius_km: float) -> List[tuple]:
+        """
+        Returns every (distance_km, name, result) within radius_km, nearest first.
+        """
+        if not radius_km >= 0:
+            return []
+        target = _unit_vector(lat, lng)
+        limit = _km_to_chord(radius_km) ** 2
+        found = []
+        stack = [(self._root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if node < 0:
+                continue
+            vector = self._points[node][0]
+            distance = _squared_distance(vector, target)
+            if distance <= limit:
+                found.append((distance, node))
+
+            axis = depth % 3
+            delta = target[axis] - vector[axis]
+            near, far = (self._left[node], self._right[node]) if delta < 0 else (self._right[node], self._left[node])
+            stack.append((near, depth + 1))
+            if delta * delta <= limit:
+                stack.append((far, depth + 1))
+
+        return self._results(sorted(found))
+
+    def _search(self, target: tuple, count: int, best: list):
+        # Stack entries carry the squared distance to the splitting plane that
+        # separates the subtree from the target
+        stack = [(self._root, 0, 0.0)]
+        while stack:
+            node, depth, plane_distance = stack.pop()
+            if node < 0:
+                continue
+            # Skip a subtree whose splitting plane is farther than the worst kept point
+            if len(best) == count and plane_distance > -best[0][0]:
+                continue
+
+            vector = self._points[node][0]
+            distance = _squared_distance(vector, target)
+            if len(best) < count:
+                heapq.heappush(best, (-distance, node))
+            elif distance < -best[0][0]:
+                heapq.heapreplace(best, (-distance, node))
+
+            axis = depth % 3
+            delta = target[axis] - vector[axis]
+            near, far = (self._left[node], self._right[node]) if delta < 0 else (self._right[node], self._left[node])
+            stack.append((far, depth + 1, delta * delta))
+            stack.append((near, depth + 1, 0.0))
+
+    def _results(self, hits: List[tuple]) -> List[tuple]:
+        results = []
+        for squared_distance, node in hits:
+            _, name, result = self._points[node]
+            results.append((_chord_to_km(math.sqrt(squared_distance)), name, result))
+        return results
+
+
+def _squared_distance(a: tuple, b: tuple) -> float:
+    return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+
+
+spatial_index = SpatialIndex(GEOCODE_DATA)
+
 @mcp.tool()
 def get_geocode(place_name: str) -> Dict[str, Any]:
     """
     Retrieves mock geolocation data for a specific place name.
 
+    Matching ignores case, accents and punctuation, understands aliases and
+    tolerates small typos.
+
     Args:
         place_name: The name of the place to geocode.
 
@@ -86,7 +518,88 @@ def get_geocode(place_name: str) -> Dict[str, Any]:
         A dictionary with the geocode data, or a ZERO_RESULTS status if not found.
     """
     logger.info(f">>> 🛠️ Tool: 'get_geocode' called for '{place_name}'")
-    return GEOCODE_DATA.get(place_name, {"results": [], "status": "ZERO_RESULTS"})
+    return geocode_index.lookup(place_name)
+
+@mcp.tool()
+def get_geocodes(place_names: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Retrieves mock geolocation data for several place names at once.
+
+    Args:
+        place_names: The names of the places to geocode.
+
+    Returns:
+        A dictionary mapping each place name to its geocode data.
+    """
+    logger.info(f">>> 🛠️ Tool: 'get_geocodes' called for {len(place_names)} places")
+    return {place_name: geocode_index.lookup(place_name) for place_name in dict.fromkeys(place_names)}
+
+@mcp.tool()
+def autocomplete_place(prefix: str, limit: int = 10) -> List[str]:
+    """
+    Suggests catalog place names starting with the given text.
+
+    Args:
+        prefix: The beginning of a place name.
+        limit: The maximum number of suggestions.
+
+    Returns:
+        A list of matching place names.
+    """
+    logger.info(f">>> 🛠️ Tool: 'autocomplete_place' called for '{prefix}'")
+    return geocode_index.complete(prefix, limit)
+
+def _valid_coordinate(lat: float, lng: float) -> bool:
+    # Written so NaN fails too
+    return -90 <= lat <= 90 and -180 <= lng <= 180
+
+def _located(hits: List[tuple]) -> Dict[str, Any]:
+    if not hits:
+        return ZERO_RESULTS
+    return {
+        "results": [{**result, "distance_km": round(distance, 3)} for distance, _, result in hits],
+        "status": "OK",
+    }
+
+@mcp.tool()
+def reverse_geocode(lat: float, lng: float, max_results: int = 1) -> Dict[str, Any]:
+    """
+    Finds the known places nearest to a coordinate.
+
+    Args:
+        lat: Latitude in degrees.
+        lng: Longitude in degrees.
+        max_results: The number of places to return, nearest first.
+
+    Returns:
+        A dictionary with the geocode data of the nearest places, each with
+        its distance in kilometres, or an INVALID_REQUEST status for a
+        coordinate out of range.
+    """
+    logger.info(f">>> 🛠️ Tool: 'reverse_geocode' called for ({lat}, {lng})")
+    if not _valid_coordinate(lat, lng):
+        return INVALID_REQUEST
+    return _located(spatial_index.nearest(lat, lng, max(1, max_results)))
+
+@mcp.tool()
+def find_places_within(lat: float, lng: float, radius_km: float) -> Dict[str, Any]:
+    """
+    Finds every known place within a radius of a coordinate.
+
+    Args:
+        lat: Latitude in degrees.
+        lng: Longitude in degrees.
+        radius_km: The search radius in kilometres.
+
+    Returns:
+        A dictionary with the geocode data of the places in range, nearest
+        first, each with its distance in kilometres, or an INVALID_REQUEST
+        status for a coordinate out of range or a negative radius.
+    """
+    logger.info(f">>> 🛠️ Tool: 'find_places_within' called for ({lat}, {lng}) within {radius_km} km")
+    if not _valid_coordinate(lat, lng) or not radius_km >= 0:
+        return INVALID_REQUEST
+    return _located(spatial_index.within(lat, lng, radius_km))
 
 if __name__ == "__main__":
     logger.info(f"🚀 MCP server started on port {os.getenv('PORT', 8084)}")
@@ -1,5 +1,8 @@
+import hashlib
+import json
 import logging
 from fastapi import APIRouter
+from fastapi.responses import Response
 from pydantic import BaseModel
 
 # Configure logging
@@ -8,6 +11,29 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+MOCK_HOTELS = {
+    "hotels": [
+        {"name": "Hotel Ritz Paris", "price_level": "Luxury"},
+        {"name": "Hôtel de Crillon", "price_level": "Luxury"},
+        {"name": "The Peninsula Paris", "price_level": "Luxury"}
+    ]
+}
+
+# Encoded once at import; every request returns the same bytes
+_MOCK_HOTELS_BODY = json.dumps(MOCK_HOTELS, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+# Version of the provider result, also sent as its strong ETag
+MOCK_HOTELS_VERSION = hashlib.blake2b(_MOCK_HOTELS_BODY, digest_size=8).hexdigest()
+_MOCK_HOTELS_HEADERS = {"ETag": f'"{MOCK_HOTELS_VERSION}"'}
+
+
+async def fetch_hotel_suggestions(destination: str) -> dict:
+    """
+    Returns the mock hotel suggestions as a fresh dict, decoded from the bytes
+    the endpoint serves so both always agree.
+    """
+    return json.loads(_MOCK_HOTELS_BODY)
+
 class TripRequest(BaseModel):
     uid: str
     destination: str
@@ -19,12 +45,4 @@ async def get_hotel_suggestions(data: TripRequest):
     """
     logger.info(f"Received request for mock hotel suggestions for UID: {data.uid}")
 
-    mock_hotels = {
-        "hotels": [
-            {"name": "Hotel Ritz Paris", "price_level": "Luxury"},
-            {"name": "Hôtel de Crillon", "price_level": "Luxury"},
-            {"name": "The Peninsula Paris", "price_level": "Luxury"}
-        ]
-    }
-
-    return mock_hotels
+    return Response(content=_MOCK_HOTELS_BODY, media_type="application/json", headers=_MOCK_HOTELS_HEADERS)
@@ -1,6 +1,21 @@
+import asyncio
+import copy
+import hashlib
+import json
 import logging
-from fastapi import APIRouter, HTTPException, Query
-from firebase.firebase_admin import get_trip_context
+from datetime import date, timedelta
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List
+from etags import etag_matches
+from firebase.firebase_admin import get_trip_context_async
+from mcps.weather import weather_route
+from mcps.hotel import hotels_route
+from mcps.food import food_route
+from mcps.activities import activities_route
+from mcps.local_transport import local_transport_route
+from mcps.primary_transport import primary_transport_route
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -8,124 +23,293 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# TODO: Implement the itinerary orchestrator that calls other MCPs to generate a full itinerary.
-def generate_full_itinerary(trip_details: dict):
+# Per-provider deadlines in seconds. A provider that misses its deadline is
+# returned empty and listed as partial instead of holding up the itinerary.
+DEFAULT_PROVIDER_TIMEOUT = 2.0
+PROVIDER_TIMEOUTS = {
+    "primary_transport": 2.5,
+    "local_transport": 1.5,
+    "daily_activities": 2.0,
+    "cafes_to_try": 1.5,
+    "weather_forecast": 1.0,
+    "hotels": 2.0,
+}
+
+
+def _trip_start(trip_details: dict) -> date | None:
     """
-    Generates a mock comprehensive itinerary.
+    Parses the trip start date, if the context carries one.
     """
+    try:
+        return date.fromisoformat(trip_details.get("startDate", ""))
+    except ValueError:
+        return None
+
+
+async def _primary_transport_section(uid: str, trip_details: dict) -> dict:
     destination = trip_details.get("destination", "Paris")
-    user_location = trip_details.get("user_location", "London") # Assuming user_location is available in trip_details
-
-    mock_itinerary_data = {
-        "primary_transport": {
-            "outbound": {
-                "type": "Flight",
-                "details": f"Flight from {user_location} to {destination}",
-                "price": 150,
-                "booking_url": "https://www.mockdata.com/flights/outbound"
-            },
-            "inbound": {
-                "type": "Flight",
-                "details": f"Flight from {destination} to {user_location}",
-                "price": 120,
-                "booking_url": "https://www.mockdata.com/flights/inbound"
-            }
+    user_location = trip_details.get("user_location", "London")
+    response = await primary_transport_route.fetch_primary_transport(destination)
+    options = response.get("transport_options", [])
+    mode = "Flight" if not options or options[0]["type"] == "Airplane" else options[0]["type"]
+
+    return {
+        "outbound": {
+            "type": mode,
+            "details": f"{mode} from {user_location} to {destination}",
+            "price": 150,
+            "booking_url": "https://www.mockdata.com/flights/outbound"
         },
-        "local_transport": {
-            "provider": "Zoomcar",
-            "details": f"Self-drive car rental from Zoomcar for 3 days in {destination}.",
-            "price": 90,
-            "booking_url": "https://www.mockdata.com/zoomcar"
+        "inbound": {
+            "type": mode,
+            "details": f"{mode} from {destination} to {user_location}",
+            "price": 120,
+            "booking_url": "https://www.mockdata.com/flights/inbound"
         },
-        "daily_activities": [
-            {
-                "day": "Day 1",
-                "date": "2025-09-26",
-                "activities": [
-                    {
-                        "name": "Eiffel Tower Visit",
-                        "type": "Landmark",
-                        "time": "10:00 AM",
-                        "description": "Ascend the iconic Eiffel Tower for panoramic views of Paris.",
-                        "imageUrl": "https://www.mockdata.com/eiffel-tower.jpg"
-                    },
-                    {
-                        "name": "Louvre Museum Tour",
-                        "type": "Museum",
-                        "time": "02:00 PM",
-                        "description": "Explore world-renowned art collections, including the Mona Lisa.",
-                        "imageUrl": "https://www.mockdata.com/louvre-museum.jpg"
-                    }
-                ]
-            },
-            {
-                "day": "Day 2",
-                "date": "2025-09-27",
-                "activities": [
-                    {
-                        "name": "Notre Dame Cathedral",
-                        "type": "Cathedral",
-                        "time": "09:30 AM",
-                        "description": "Admire the Gothic architecture of Notre Dame.",
-                        "imageUrl": "https://www.mockdata.com/notre-dame.jpg"
-                    },
-                    {
-                        "name": "Seine River Cruise",
-                        "type": "Tour",
-                        "time": "04:00 PM",
-                        "description": "Enjoy a relaxing boat trip along the Seine River.",
-                        "imageUrl": "https://www.mockdata.com/seine-cruise.jpg"
-                    }
-                ]
-            }
-        ],
-        "cafes_to_try": [
-            {
-                "name": "Cafe Amore",
-                "cuisine": "Italian",
-                "rating": 4.7,
-                "location": "Riverside",
-                "reason": "Romantic ambiance with delicious pasta.",
-                "url": "https://www.mockdata.com/maps/search/Cafe+Amore"
-            },
-            {
-                "name": "The Daily Grind",
-                "cuisine": "Continental",
-                "rating": 4.2,
-                "location": "City Center",
-                "reason": "Great for a quick coffee and light bites.",
-                "url": "https://www.mockdata.com/maps/search/The+Daily+Grind"
-            }
-        ],
-        "weather_forecast": [
-            {"date": "2025-09-26", "summary": "Sunny", "temperature": "22°C"},
-            {"date": "2025-09-27", "summary": "Partly Cloudy", "temperature": "20°C"},
-            {"date": "2025-09-28", "summary": "Light Rain", "temperature": "18°C"}
-        ]
+        "options": options
     }
-    logger.info(f"Generated mock itinerary for {destination}.")
-    return mock_itinerary_data
+
+
+async def _local_transport_section(uid: str, trip_details: dict) -> dict:
+    destination = trip_details.get("destination", "Paris")
+    response = await local_transport_route.fetch_local_transport(destination)
+    options = response.get("transport_options", [])
+    recommended = options[0] if options else {"type": "Zoomcar", "details": f"Self-drive car rental in {destination}."}
+
+    return {
+        "provider": recommended["type"],
+        "details": recommended["details"],
+        "price": 90,
+        "booking_url": "https://www.mockdata.com/zoomcar",
+        "options": options
+    }
+
+
+async def _daily_activities_section(uid: str, trip_details: dict) -> list:
+    destination = trip_details.get("destination", "Paris")
+    response = await activities_route.fetch_activities(destination)
+
+    return [
+        {
+            "day": day_plan["day"],
+            "date": day_plan["date"],
+            "activities": [
+                {
+                    "name": activity["name"],
+                    "type": activity["type"],
+                    "time": activity.get("time", ""),
+                    "description": activity.get("reason", ""),
+                    "imageUrl": activity.get("imageUrl")
+                }
+                for activity in day_plan["activities"]
+            ]
+        }
+        for day_plan in response.get("itinerary", [])
+    ]
+
+
+async def _cafes_section(uid: str, trip_details: dict) -> list:
+    destination = trip_details.get("destination", "Paris")
+    response = await food_route.fetch_food_suggestions(destination)
+
+    return [
+        {
+            "name": cafe["name"],
+            "cuisine": cafe["cuisine"],
+            "rating": cafe["rating"],
+            "location": cafe["location"],
+            "reason": cafe["reason"],
+            "url": cafe["url"]
+        }
+        for cafe in response.get("cafes", [])
+    ]
+
+
+async def _weather_section(uid: str, trip_details: dict) -> list:
+    destination = trip_details.get("destination", "Paris")
+    response = await weather_route.fetch_weather_forecast(destination)
+    start = _trip_start(trip_details)
+
+    return [
+        {
+            "date": (start + timedelta(days=day["day"] - 1)).isoformat() if start else f"Day {day['day']}",
+            "summary": day["summary"],
+            "temperature": day["temperature"]
+        }
+        for day in response.get("forecast", [])
+    ]
+
+
+async def _hotels_section(uid: str, trip_details: dict) -> list:
+    destination = trip_details.get("destination", "Paris")
+    response = await hotels_route.fetch_hotel_suggestions(destination)
+    return response.get("hotels", [])
+
+
+# Trip fields the providers read. Trips that agree on all of them produce the
+# same itinerary, so batch requests call the providers once per shape.
+TRIP_SHAPE_FIELDS = ("destination", "user_location", "startDate", "endDate")
+
+# Unique trip shapes generated at once by a batch request
+BATCH_CONCURRENCY = 16
+
+# Most UIDs accepted by one batch request
+MAX_BATCH_UIDS = 1000
+
+# UIDs whose trip contexts a batch request looks up together
+BATCH_CONTEXT_CHUNK = 64
+
+# Bump whenever the section builders change the shape of their output, so
+# clients holding an older itinerary do not revalidate against the new one.
+ITINERARY_FORMAT_VERSION = "1"
+
+# Versions of the provider results the itinerary is built from
+PROVIDER_VERSIONS = (
+    primary_transport_route.MOCK_PRIMARY_TRANSPORT_VERSION,
+    local_transport_route.MOCK_LOCAL_TRANSPORT_VERSION,
+    activities_route.MOCK_ACTIVITIES_VERSION,
+    food_route.MOCK_FOOD_VERSION,
+    weather_route.MOCK_WEATHER_VERSION,
+    hotels_route.MOCK_HOTELS_VERSION,
+)
+
+class BatchItineraryRequest(BaseModel):
+    uids: List[str] = Field(..., max_length=MAX_BATCH_UIDS)
+
+# Itinerary section -> coroutine that calls its provider and shapes the result.
+SECTION_BUILDERS = {
+    "primary_transport": _primary_transport_section,
+    "local_transport": _local_transport_section,
+    "daily_activities": _daily_activities_section,
+    "cafes_to_try": _cafes_section,
+    "weather_forecast": _weather_section,
+    "hotels": _hotels_section,
+}
+
+
+# Value a section takes when its provider did not finish. Sections keep their
+# type, so clients can always iterate lists and null-check objects.
+EMPTY_SECTIONS = {
+    "primary_transport": None,
+    "local_transport": None,
+    "daily_activities": [],
+    "cafes_to_try": [],
+    "weather_forecast": [],
+    "hotels": [],
+}
+
+
+async def build_section(section: str, uid: str, trip_details: dict) -> tuple[str, object, bool]:
+    """
+    Runs one section builder under its provider deadline.
+
+    Returns (section, payload, complete). On timeout or provider failure the
+    payload is the section's empty value and complete is False.
+    """
+    builder = SECTION_BUILDERS[section]
+    timeout = PROVIDER_TIMEOUTS.get(section, DEFAULT_PROVIDER_TIMEOUT)
+
+    try:
+        payload = await asyncio.wait_for(builder(uid, trip_details), timeout=timeout)
+        return section, payload, True
+    except asyncio.TimeoutError:
+        logger.warning(f"Provider for '{section}' missed its {timeout}s deadline for UID: {uid}")
+    except Exception:
+        logger.exception(f"Provider for '{section}' failed for UID: {uid}")
+    return section, copy.copy(EMPTY_SECTIONS[section]), False
+
+
+async def iter_itinerary_sections(uid: str, trip_details: dict):
+    """
+    Yields (section, payload, complete) tuples in the order providers finish.
+
+    Pending providers are cancelled if the consumer stops iterating early,
+    e.g. when a streaming client disconnects.
+    """
+    tasks = [
+        asyncio.ensure_future(build_section(section, uid, trip_details))
+        for section in SECTION_BUILDERS
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def generate_full_itinerary(uid: str, trip_details: dict) -> dict:
+    """
+    Generates a full itinerary by calling every provider concurrently.
+
+    Each provider runs under its own deadline, so the response time tracks the
+    slowest single provider rather than the sum of all of them. Sections that
+    did not finish in time are returned empty and listed under
+    "partial_sections".
+    """
+    results = await asyncio.gather(
+        *(build_section(section, uid, trip_details) for section in SECTION_BUILDERS)
+    )
+
+    itinerary_data = {section: payload for section, payload, _ in results}
+    itinerary_data["partial_sections"] = [section for section, _, complete in results if not complete]
+
+    logger.info(f"Generated itinerary for {trip_details.get('destination', 'N/A')} "
+                f"({len(itinerary_data['partial_sections'])} partial sections).")
+    return itinerary_data
+
+def _trip_shape(trip_details: dict) -> tuple:
+    return tuple(json.dumps(trip_details.get(field), sort_keys=True) for field in TRIP_SHAPE_FIELDS)
+
+def itinerary_etag(trip_details: dict) -> str:
+    """
+    Strong ETag for the itinerary built from a trip context.
+
+    Derived from the trip fields the providers read plus the provider result
+    versions, so it can be computed without running the orchestrator and is
+    the same on every worker.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (ITINERARY_FORMAT_VERSION, *PROVIDER_VERSIONS, *_trip_shape(trip_details)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return f'"{digest.hexdigest()}"'
 
 @router.get("")
-async def get_full_itinerary(uid: str = Query(..., description="User ID to fetch trip details")):
+async def get_full_itinerary(
+    uid: str = Query(..., description="User ID to fetch trip details"),
+    if_none_match: str | None = Header(None),
+):
     """
     Provides a full itinerary by orchestrating other services.
+
+    Responses carry a strong ETag; a matching If-None-Match is answered with
+    304 before any provider is called.
     """
     logger.info(f"Received request for full itinerary for UID: {uid}")
 
     try:
         # Fetch trip details from Firebase
-        trip_details = get_trip_context(uid)
+        trip_details = await get_trip_context_async(uid)
         if not trip_details:
             logger.warning(f"No trip details found for UID: {uid}")
             raise HTTPException(status_code=404, detail="Trip details not found for the given UID.")
 
-        # Call the placeholder orchestrator
+        etag = itinerary_etag(trip_details)
+        if etag_matches(if_none_match, etag):
+            logger.info(f"Itinerary for UID: {uid} not modified")
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
         logger.info(f"Generating full itinerary for trip: {trip_details.get('name', 'N/A')}")
-        itinerary_data = generate_full_itinerary(trip_details)
+        itinerary_data = await generate_full_itinerary(uid, trip_details)
 
         logger.info(f"Successfully generated full itinerary for UID: {uid}")
-        return itinerary_data
+        # Partial itineraries are not cacheable: a retry may complete them
+        headers = {"Cache-Control": "no-cache"}
+        if not itinerary_data["partial_sections"]:
+            headers["ETag"] = etag
+        # The itinerary is plain JSON data; skip FastAPI's jsonable_encoder pass
+        return JSONResponse(itinerary_data, headers=headers)
 
     except HTTPException as http_exc:
         # Re-raise HTTPException to let FastAPI handle it
@@ -136,4 +320,123 @@ async def get_full_itinerary(uid: str = Query(..., description="User ID to fetch
         return {
             "error": "An unexpected error occurred.",
             "details": str(e)
-        }
\ No newline at end of file
+        }
+
+async def _stream_itinerary(uid: str, trip_details: dict):
+    """
+    Encodes each itinerary section as one NDJSON line as soon as it is ready,
+    followed by a final summary line listing the partial sections.
+    """
+    partial_sections = []
+    async for section, payload, complete in iter_itinerary_sections(uid, trip_details):
+        if not complete:
+            partial_sections.append(section)
+        yield json.dumps({"section": section, "data": payload, "complete": complete}) + "\n"
+
+    logger.info(f"Finished streaming itinerary for UID: {uid} ({len(partial_sections)} partial sections).")
+    yield json.dumps({"done": True, "partial_sections": partial_sections}) + "\n"
+
+@router.get("/stream")
+async def stream_full_itinerary(uid: str = Query(..., description="User ID to fetch trip details")):
+    """
+    Streams the itinerary as NDJSON, one line per section in completion order.
+    """
+    logger.info(f"Received request for streamed itinerary for UID: {uid}")
+
+    trip_details = await get_trip_context_async(uid)
+    if not trip_details:
+        logger.warning(f"No trip details found for UID: {uid}")
+        raise HTTPException(status_code=404, detail="Trip details not found for the given UID.")
+
+    return StreamingResponse(
+        _stream_itinerary(uid, trip_details),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _batch_error(uid: str, error: str) -> str:
+    return json.dumps({"uid": uid, "error": error}) + "\n"
+
+async def _load_contexts(uids: List[str]) -> list:
+    """
+    Looks up trip contexts for a chunk of UIDs; a failed lookup comes back
+    as its exception instead of failing the chunk.
+    """
+    contexts = await asyncio.gather(*(get_trip_context_async(uid) for uid in uids), return_exceptions=True)
+    return list(zip(uids, contexts))
+
+async def _stream_batch_itineraries(uids: List[str]):
+    """
+    Generates one itinerary per unique trip shape and emits an NDJSON line
+    per uid as each shape completes. Each shared itinerary is encoded once.
+
+    Trip contexts are looked up in chunks, the next chunk while the current
+    one is generated, so the first lines go out before every context has
+    loaded. A uid whose lookup or generation fails gets an error line and
+    the stream carries on with the rest.
+    """
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    # Trip shape -> task resolving to the encoded itinerary, shared by chunks
+    generated = {}
+
+    async def generate(uid, trip_details):
+        async with semaphore:
+            return json.dumps(await generate_full_itinerary(uid, trip_details))
+
+    chunks = [uids[start:start + BATCH_CONTEXT_CHUNK] for start in range(0, len(uids), BATCH_CONTEXT_CHUNK)]
+    loading = asyncio.ensure_future(_load_contexts(chunks[0])) if chunks else None
+    try:
+        for index in range(len(chunks)):
+            loaded = await loading
+            loading = asyncio.ensure_future(_load_contexts(chunks[index + 1])) if index + 1 < len(chunks) else None
+
+            # Generation task -> UIDs of this chunk waiting on it
+            members = {}
+            for uid, trip_details in loaded:
+                if isinstance(trip_details, Exception):
+                    logger.error(f"Trip context lookup failed for UID: {uid}", exc_info=trip_details)
+                    yield _batch_error(uid, "Trip details could not be loaded.")
+                elif not trip_details:
+                    yield _batch_error(uid, "Trip details not found for the given UID.")
+                else:
+                    shape = _trip_shape(trip_details)
+                    task = generated.get(shape)
+                    if task is None:
+                        task = generated[shape] = asyncio.ensure_future(generate(uid, trip_details))
+                    members.setdefault(task, []).append(uid)
+
+            pending = set(members)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        logger.error(f"Itinerary generation failed for UIDs: {members[task]}", exc_info=task.exception())
+                        yield "".join(_batch_error(uid, "Itinerary could not be generated.") for uid in members[task])
+                        continue
+                    encoded = task.result()
+                    yield "".join(f'{{"uid": {json.dumps(uid)}, "itinerary": {encoded}}}\n' for uid in members[task])
+
+        logger.info(f"Batch of {len(uids)} UIDs reduced to {len(generated)} unique trip shapes.")
+    finally:
+        if loading is not None:
+            loading.cancel()
+        for task in generated.values():
+            task.cancel()
+
+@router.post("/batch")
+async def batch_itineraries(request: BatchItineraryRequest):
+    """
+    Streams itineraries for many UIDs as NDJSON, one line per UID.
+
+    UIDs whose trips share a destination and dates share a single set of
+    provider calls. At most MAX_BATCH_UIDS UIDs are accepted per request.
+    """
+    uids = list(dict.fromkeys(request.uids))
+    logger.info(f"Received batch itinerary request for {len(uids)} UIDs")
+
+    return StreamingResponse(
+        _stream_batch_itineraries(uids),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,5 +1,8 @@
+import hashlib
+import json
 import logging
 from fastapi import APIRouter
+from fastapi.responses import Response
 from pydantic import BaseModel
 
 # Configure logging
@@ -8,6 +11,29 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+MOCK_LOCAL_TRANSPORT = {
+    "transport_options": [
+        {"type": "Metro", "details": "The Paris Métro is a convenient and efficient way to get around the city."},
+        {"type": "Bus", "details": "Buses offer a scenic way to travel and cover areas not served by the metro."},
+        {"type": "Vélib'", "details": "A public bicycle sharing system available throughout Paris."}
+    ]
+}
+
+# Encoded once at import; every request returns the same bytes
+_MOCK_LOCAL_TRANSPORT_BODY = json.dumps(MOCK_LOCAL_TRANSPORT, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+# Version of the provider result, also sent as its strong ETag
+MOCK_LOCAL_TRANSPORT_VERSION = hashlib.blake2b(_MOCK_LOCAL_TRANSPORT_BODY, digest_size=8).hexdigest()
+_MOCK_LOCAL_TRANSPORT_HEADERS = {"ETag": f'"{MOCK_LOCAL_TRANSPORT_VERSION}"'}
+
+
+async def fetch_local_transport(destination: str) -> dict:
+    """
+    Returns the mock local transport options as a fresh dict, decoded from the bytes
+    the endpoint serves so both always agree.
+    """
+    return json.loads(_MOCK_LOCAL_TRANSPORT_BODY)
+
 class TripRequest(BaseModel):
     uid: str
     destination: str
@@ -19,12 +45,4 @@ async def get_local_transport(data: TripRequest):
     """
     logger.info(f"Received request for mock local transport options for UID: {data.uid}")
 
-    mock_transport = {
-        "transport_options": [
-            {"type": "Metro", "details": "The Paris Métro is a convenient and efficient way to get around the city."},
-            {"type": "Bus", "details": "Buses offer a scenic way to travel and cover areas not served by the metro."},
-            {"type": "Vélib'", "details": "A public bicycle sharing system available throughout Paris."}
-        ]
-    }
-
-    return mock_transport
+    return Response(content=_MOCK_LOCAL_TRANSPORT_BODY, media_type="application/json", headers=_MOCK_LOCAL_TRANSPORT_HEADERS)
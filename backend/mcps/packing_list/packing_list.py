@@ -1,7 +1,9 @@
 import asyncio
 import logging
 import os
-from typing import List, Dict, Any
+import re
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple
 
 from fastmcp import FastMCP
 
@@ -10,17 +12,95 @@ logging.basicConfig(format="[%(levelname)s]: %(message)s", level=logging.INFO)
 
 mcp = FastMCP("Packing List MCP Server 🧳")
 
-import asyncio
-import logging
-import os
-from typing import List, Dict, Any
+# Base packing list
+BASE_PACKING_LIST = {
+    "clothing": ["Underwear", "Socks", "T-shirts", "Pants/Shorts"],
+    "gear": ["Phone and charger", "Power bank", "Headphones"],
+    "documents": ["Passport/ID", "Visa (if required)", "Tickets", "Hotel reservations"],
+    "extras": ["Book/e-reader", "Snacks"],
+}
+
+# (input, trigger, category, items). Weather triggers match words of the
+# weather summary, split on hyphens too ("cold-and-rainy"); activity and
+# preference triggers match whole tags.
+PACKING_RULES = [
+    # Add items based on weather
+    ("weather", "cold", "clothing", ["Jacket", "Sweater", "Beanie", "Gloves"]),
+    ("weather", "rainy", "clothing", ["Raincoat"]),
+    ("weather", "rainy", "gear", ["Umbrella"]),
+    ("weather", "hot", "clothing", ["Shorts", "Tank tops", "Sun hat"]),
+    ("weather", "humid", "clothing", ["Lightweight clothing"]),
+    # Add items based on activities
+    ("activity", "hiking", "gear", ["Hiking boots", "Backpack", "Water bottle"]),
+    ("activity", "beach", "clothing", ["Swimsuit"]),
+    ("activity", "beach", "gear", ["Sunscreen", "Beach towel", "Sunglasses"]),
+    ("activity", "temple visits", "clothing", ["Modest clothing (long pants/skirt, covered shoulders)"]),
+    # Add items based on user preferences
+    ("preference", "budget travel", "extras", ["Reusable water bottle"]),
+    ("preference", "eco-friendly", "extras", ["Reusable shopping bag", "Solid toiletries"]),
+    ("preference", "luxury", "extras", ["Portable speaker"]),
+]
 
-from fastmcp import FastMCP
+_WORD = re.compile(r"\w+")
 
-logger = logging.getLogger(__name__)
-logging.basicConfig(format="[%(levelname)s]: %(message)s", level=logging.INFO)
 
-mcp = FastMCP("Packing List MCP Server 🧳")
+class PackingRules:
+    """
+    The rule table compiled for constant-cost lookups.
+
+    Each rule is a bit. Every trigger maps to the bitmask of the rules it
+    fires, so a request ORs one mask per input token and never scans the
+    rule table; adding rules does not slow it down. Lists are memoized per
+    normalized input signature, and built per fired-rule mask, so different
+    signatures that fire the same rules share one list.
+    """
+
+    def __init__(self, base: Dict[str, List[str]], rules: List[tuple], cache_size: int = 4096):
+        self.base = {category: tuple(items) for category, items in base.items()}
+        self._triggers = {}
+        self._rules = []
+        for bit, (source, trigger, category, items) in enumerate(rules):
+            key = (source, trigger.casefold())
+            self._triggers[key] = self._triggers.get(key, 0) | (1 << bit)
+            self._rules.append((category, tuple(items)))
+
+        self.for_signature = lru_cache(maxsize=cache_size)(self._for_signature)
+        self._for_mask = lru_cache(maxsize=cache_size)(self._build)
+
+    @staticmethod
+    def signature(weather_summary: str, activity_tags: List[str], user_preferences: List[str]) -> Tuple[frozenset, frozenset, frozenset]:
+        """
+        Normalizes the inputs a packing list depends on.
+        """
+        return (
+            frozenset(_WORD.findall(weather_summary.casefold())),
+            frozenset(tag.strip().casefold() for tag in activity_tags),
+            frozenset(preference.strip().casefold() for preference in user_preferences),
+        )
+
+    def _for_signature(self, signature: Tuple[frozenset, frozenset, frozenset]) -> Dict[str, Tuple[str, ...]]:
+        triggers = self._triggers
+        mask = 0
+        for source, tokens in zip(("weather", "activity", "preference"), signature):
+            for token in tokens:
+                mask |= triggers.get((source, token), 0)
+        return self._for_mask(mask)
+
+    def _build(self, mask: int) -> Dict[str, Tuple[str, ...]]:
+        packing_list = {category: list(items) for category, items in self.base.items()}
+        while mask:
+            bit = mask & -mask
+            category, items = self._rules[bit.bit_length() - 1]
+            packing_list.setdefault(category, []).extend(items)
+            mask ^= bit
+        return {category: tuple(items) for category, items in packing_list.items()}
+
+    def packing_list(self, weather_summary: str, activity_tags: List[str], user_preferences: List[str]) -> Dict[str, List[str]]:
+        compiled = self.for_signature(self.signature(weather_summary, activity_tags, user_preferences))
+        return {category: list(items) for category, items in compiled.items()}
+
+
+packing_rules = PackingRules(BASE_PACKING_LIST, PACKING_RULES)
 
 
 @mcp.tool()
@@ -50,43 +130,48 @@ def generate_packing_list(
     """
     logger.info(f">>> 🛠️ Tool: 'generate_packing_list' called for destination '{destination}'")
 
-    # Base packing list
-    packing_list = {
-        "clothing": ["Underwear", "Socks", "T-shirts", "Pants/Shorts"],
-        "gear": ["Phone and charger", "Power bank", "Headphones"],
-        "documents": ["Passport/ID", "Visa (if required)", "Tickets", "Hotel reservations"],
-        "extras": ["Book/e-reader", "Snacks"],
-    }
+    return packing_rules.packing_list(weather_summary, activity_tags, user_preferences)
 
-    # Add items based on weather
-    if "cold" in weather_summary:
-        packing_list["clothing"].extend(["Jacket", "Sweater", "Beanie", "Gloves"])
-    if "rainy" in weather_summary:
-        packing_list["clothing"].append("Raincoat")
-        packing_list["gear"].append("Umbrella")
-    if "hot" in weather_summary:
-        packing_list["clothing"].extend(["Shorts", "Tank tops", "Sun hat"])
-    if "humid" in weather_summary:
-        packing_list["clothing"].append("Lightweight clothing")
 
-    # Add items based on activities
-    if "hiking" in activity_tags:
-        packing_list["gear"].extend(["Hiking boots", "Backpack", "Water bottle"])
-    if "beach" in activity_tags:
-        packing_list["clothing"].append("Swimsuit")
-        packing_list["gear"].extend(["Sunscreen", "Beach towel", "Sunglasses"])
-    if "temple visits" in activity_tags:
-        packing_list["clothing"].append("Modest clothing (long pants/skirt, covered shoulders)")
+@mcp.tool()
+def generate_group_packing_lists(
+    destination: str,
+    start_date: str,
+    end_date: str,
+    weather_summary: str,
+    travelers: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Generates a personalized packing list for every traveler in a group in
+    one call. The trip and weather are shared; activities and preferences
+    are per traveler.
 
-    # Add items based on user preferences
-    if "budget travel" in user_preferences:
-        packing_list["extras"].append("Reusable water bottle")
-    if "eco-friendly" in user_preferences:
-        packing_list["extras"].extend(["Reusable shopping bag", "Solid toiletries"])
-    if "luxury" in user_preferences:
-        packing_list["extras"].append("Portable speaker")
+    Args:
+        destination: The destination of the trip.
+        start_date: The start date of the trip.
+        end_date: The end date of the trip.
+        weather_summary: A summary of the weather forecast (e.g. "cold and rainy", "hot and humid").
+        travelers: One entry per traveler with "name", "activity_tags" and "user_preferences".
 
-    return packing_list
+    Returns:
+        A dictionary with each traveler's packing list, in input order.
+    """
+    logger.info(f">>> 🛠️ Tool: 'generate_group_packing_lists' called for {len(travelers)} travelers to '{destination}'")
+
+    return {
+        "destination": destination,
+        "travelers": [
+            {
+                "name": traveler.get("name", f"Traveler {i}"),
+                "packing_list": packing_rules.packing_list(
+                    weather_summary,
+                    traveler.get("activity_tags", []),
+                    traveler.get("user_preferences", []),
+                ),
+            }
+            for i, traveler in enumerate(travelers, 1)
+        ],
+    }
 
 
 if __name__ == "__main__":
@@ -98,13 +183,3 @@ if __name__ == "__main__":
             port=os.getenv("PORT", 8086),
         )
     )
-
-if __name__ == "__main__":
-    logger.info(f"🚀 MCP server started on port {os.getenv('PORT', 8086)}")
-    asyncio.run(
-        mcp.run_async(
-            transport="http",
-            host="0.0.0.0",
-            port=os.getenv("PORT", 8086),
-        )
-    )
\ No newline at end of file
@@ -1,5 +1,8 @@
+import hashlib
+import json
 import logging
 from fastapi import APIRouter
+from fastapi.responses import Response
 from pydantic import BaseModel
 
 # Configure logging
@@ -8,6 +11,28 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+MOCK_PRIMARY_TRANSPORT = {
+    "transport_options": [
+        {"type": "Airplane", "details": "Flights are available from major airports to Charles de Gaulle Airport (CDG)."},
+        {"type": "Train", "details": "High-speed trains (TGV) connect Paris to other major European cities."}
+    ]
+}
+
+# Encoded once at import; every request returns the same bytes
+_MOCK_PRIMARY_TRANSPORT_BODY = json.dumps(MOCK_PRIMARY_TRANSPORT, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+# Version of the provider result, also sent as its strong ETag
+MOCK_PRIMARY_TRANSPORT_VERSION = hashlib.blake2b(_MOCK_PRIMARY_TRANSPORT_BODY, digest_size=8).hexdigest()
+_MOCK_PRIMARY_TRANSPORT_HEADERS = {"ETag": f'"{MOCK_PRIMARY_TRANSPORT_VERSION}"'}
+
+
+async def fetch_primary_transport(destination: str) -> dict:
+    """
+    Returns the mock primary transport options as a fresh dict, decoded from the bytes
+    the endpoint serves so both always agree.
+    """
+    return json.loads(_MOCK_PRIMARY_TRANSPORT_BODY)
+
 class TripRequest(BaseModel):
     uid: str
     destination: str
@@ -19,11 +44,4 @@ async def get_primary_transport(data: TripRequest):
     """
     logger.info(f"Received request for mock primary transport options for UID: {data.uid}")
 
-    mock_transport = {
-        "transport_options": [
-            {"type": "Airplane", "details": "Flights are available from major airports to Charles de Gaulle Airport (CDG)."},
-            {"type": "Train", "details": "High-speed trains (TGV) connect Paris to other major European cities."}
-        ]
-    }
-
-    return mock_transport
+    return Response(content=_MOCK_PRIMARY_TRANSPORT_BODY, media_type="application/json", headers=_MOCK_PRIMARY_TRANSPORT_HEADERS)
@@ -1,7 +1,10 @@
 import asyncio
 import logging
 import os
-from typing import List, Dict, Any
+import re
+import sys
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple
 
 from fastmcp import FastMCP
 
@@ -13,11 +16,217 @@ mcp = FastMCP("Translator MCP Server 🌐")
 # Mock translation data
 TRANSLATIONS = {
     "en": {
-        "es": {"hello": "hola", "goodbye": "adiós"},
-        "fr": {"hello": "bonjour", "goodbye": "au revoir"}
+        "es": {
+            "hello": "hola", "goodbye": "adiós", "thank you": "gracias", "please": "por favor",
+            "good morning": "buenos días", "where is": "dónde está", "the": "el",
+            "train station": "estación de tren", "the train station": "la estación de tren",
+            "how much": "cuánto", "how much is it": "cuánto cuesta",
+        },
+        "fr": {
+            "hello": "bonjour", "goodbye": "au revoir", "thank you": "merci", "please": "s'il vous plaît",
+            "good morning": "bonjour", "where is": "où est", "the": "le",
+            "train station": "gare", "the train station": "la gare",
+            "how much": "combien", "how much is it": "c'est combien",
+        }
     }
 }
 
+NOT_FOUND = "Translation not found"
+
+_WORD = re.compile(r"\w+(?:'\w+)*")
+_TRANSLATION = None  # trie key holding a phrase's translation
+
+
+class PhraseTable:
+    """
+    Word-level trie over one language pair's phrase table.
+
+    Input is segmented by longest match: at each word the trie is walked as
+    far as the text allows and the longest complete phrase wins, so
+    "the train station" beats "the" + "train station". Words outside the
+    table are kept as they are.
+    """
+
+    def __init__(self, phrases: Dict[str, str]):
+        self.root = {}
+        for phrase, translation in phrases.items():
+            node = self.root
+            for word in _WORD.findall(phrase.casefold()):
+                node = node.setdefault(word, {})
+            node[_TRANSLATION] = translation
+
+    def translate(self, text: str) -> Tuple[str, List[str]]:
+        """
+        Returns (translated text, untranslated words). Punctuation and the
+        spacing between segments are preserved.
+        """
+        matches = list(_WORD.finditer(text))
+        words = [match.group().casefold() for match in matches]
+        out = [text[:matches[0].start()] if matches else text]
+        untranslated = []
+
+        i = 0
+        while i < len(words):
+            node, end, translation = self.root, i, None
+            for j in range(i, len(words)):
+                node = node.get(words[j])
+                if node is None:
+                    break
+                if _TRANSLATION in node:
+                    end, translation = j + 1, node[_TRANSLATION]
+
+            if translation is None:
+                end, translation = i + 1, matches[i].group()
+                untranslated.append(translation)
+            else:
+                translation = _match_case(matches[i].group(), translation)
+
+            following = matches[end].start() if end < len(matches) else len(text)
+            out.append(translation + text[matches[end - 1].end():following])
+            i = end
+
+        return "".join(out), untranslated
+
+
+def _match_case(source: str, translation: str) -> str:
+    if len(source) > 1 and source.isupper():
+        return translation.upper()
+    if source[:1].isupper():
+        return translation[:1].upper() + translation[1:]
+    return translation
+
+
+# Pairs without a direct table are translated through this language
+PIVOT_LANGUAGE = "en"
+
+
+def _interned(phrases: Dict[str, str]) -> Dict[str, str]:
+    # Phrase strings repeat across the direct, inverse and pivot tables;
+    # interning stores each one once.
+    return {sys.intern(phrase.casefold()): sys.intern(translation) for phrase, translation in phrases.items()}
+
+
+def _inverted(phrases: Dict[str, str]) -> Dict[str, str]:
+    """
+    Reverses a phrase table. When several phrases share a translation the
+    shortest one wins ("bonjour" -> "hello", not "good morning").
+    """
+    inverse = {}
+    for phrase, translation in sorted(phrases.items(), key=lambda item: (len(item[0]), item[0]), reverse=True):
+        inverse[sys.intern(translation.casefold())] = phrase
+    return inverse
+
+
+class TranslationEngine:
+    """
+    Compiled phrase tables for every supported language pair.
+
+    Besides the direct pairs in the catalog, every pair is derived in both
+    directions: inverse tables from direct ones, and pivot tables (es -> en
+    -> fr) by composing each language's table to and from PIVOT_LANGUAGE.
+    Direct entries win over inverse ones, which win over pivoted ones.
+    Everything is built up front, so selecting a pair is a dict lookup;
+    add_pair() rebuilds only the pairs that involve the changed languages.
+    Translations of repeated strings are cached.
+    """
+
+    def __init__(self, translations: Dict[str, Dict[str, Dict[str, str]]], pivot: str = PIVOT_LANGUAGE, cache_size: int = 8192):
+        self.pivot = pivot
+        self._direct = {}
+        self._to_pivot = {}
+        self._from_pivot = {}
+        self._tables = {}
+        self.translate = lru_cache(maxsize=cache_size)(self._translate)
+
+        for source_language, targets in translations.items():
+            for target_language, phrases in targets.items():
+                self._direct[(source_language, target_language)] = _interned(phrases)
+        languages = self.languages()
+        for language in languages:
+            self._link_to_pivot(language)
+        for source_language in languages:
+            for target_language in languages:
+                self._build_pair(source_language, target_language)
+
+    def languages(self) -> List[str]:
+        return sorted({language for pair in self._direct for language in pair})
+
+    def pairs(self) -> List[Tuple[str, str]]:
+        return sorted(self._tables)
+
+    def table(self, source_language: str, target_language: str) -> PhraseTable | None:
+        return self._tables.get((source_language, target_language))
+
+    def add_pair(self, source_language: str, target_language: str, phrases: Dict[str, str]):
+        """
+        Adds (or extends) a direct phrase table and rebuilds only the pairs
+        involving its two languages, not the full cross product.
+        """
+        pair = (source_language, target_language)
+        self._direct[pair] = {**self._direct.get(pair, {}), **_interned(phrases)}
+
+        changed = {source_language, target_language}
+        for language in changed:
+            self._link_to_pivot(language)
+        for language in self.languages():
+            for other in changed:
+                self._build_pair(language, other)
+                self._build_pair(other, language)
+        self.translate.cache_clear()
+        logger.info(f"Added {len(phrases)} phrases for {source_language}->{target_language}; {len(self._tables)} pairs supported")
+
+    def _link_to_pivot(self, language: str):
+        if language == self.pivot:
+            return
+        self._to_pivot[language] = {
+            **_inverted(self._direct.get((self.pivot, language), {})),
+            **self._direct.get((language, self.pivot), {}),
+        }
+        self._from_pivot[language] = {
+            **_inverted(self._direct.get((language, self.pivot), {})),
+            **self._direct.get((self.pivot, language), {}),
+        }
+
+    def _build_pair(self, source_language: str, target_language: str):
+        if source_language == target_language:
+            return
+
+        if source_language == self.pivot:
+            phrases = dict(self._from_pivot.get(target_language, {}))
+        elif target_language == self.pivot:
+            phrases = dict(self._to_pivot.get(source_language, {}))
+        else:
+            from_pivot = self._from_pivot.get(target_language, {})
+            phrases = {
+                phrase: from_pivot[pivot_phrase.casefold()]
+                for phrase, pivot_phrase in self._to_pivot.get(source_language, {}).items()
+                if pivot_phrase.casefold() in from_pivot
+            }
+            phrases.update(_inverted(self._direct.get((target_language, source_language), {})))
+            phrases.update(self._direct.get((source_language, target_language), {}))
+
+        if phrases:
+            self._tables[(source_language, target_language)] = PhraseTable(phrases)
+        else:
+            self._tables.pop((source_language, target_language), None)
+
+    def _translate(self, text: str, source_language: str, target_language: str) -> Dict[str, Any]:
+        table = self.table(source_language, target_language)
+        translated_text, untranslated = table.translate(text) if table else (NOT_FOUND, [])
+        if table and len(untranslated) == len(_WORD.findall(text)):
+            translated_text = NOT_FOUND
+
+        return {
+            "original_text": text,
+            "translated_text": translated_text,
+            "source_language": source_language,
+            "target_language": target_language,
+            "untranslated": untranslated,
+        }
+
+
+engine = TranslationEngine(TRANSLATIONS)
+
 @mcp.tool()
 def translate_text(text: str, source_language: str, target_language: str) -> Dict[str, Any]:
     """
@@ -32,12 +241,31 @@ def translate_text(text: str, source_language: str, target_language: str) -> Dic
         A dictionary with the translation details.
     """
     logger.info(f">>> 🛠️ Tool: 'translate_text' called for '{text}' from '{source_language}' to '{target_language}'")
-    translated_text = TRANSLATIONS.get(source_language, {}).get(target_language, {}).get(text.lower(), "Translation not found")
+    return dict(engine.translate(text, source_language, target_language))
+
+@mcp.tool()
+def translate_batch(texts: List[str], source_language: str, target_language: str) -> Dict[str, Any]:
+    """
+    Translates many texts from one language to another in a single call,
+    e.g. every label of a UI screen.
+
+    Args:
+        texts: The texts to translate.
+        source_language: The source language code (e.g., 'en').
+        target_language: The target language code (e.g., 'es').
+
+    Returns:
+        A dictionary with the translations, in the order of the input texts.
+    """
+    logger.info(f">>> 🛠️ Tool: 'translate_batch' called for {len(texts)} texts from '{source_language}' to '{target_language}'")
+    translations = [engine.translate(text, source_language, target_language) for text in texts]
     return {
-        "original_text": text,
-        "translated_text": translated_text,
         "source_language": source_language,
-        "target_language": target_language
+        "target_language": target_language,
+        "translations": [
+            {"original_text": t["original_text"], "translated_text": t["translated_text"], "untranslated": t["untranslated"]}
+            for t in translations
+        ],
     }
 
 if __name__ == "__main__":
@@ -1,5 +1,8 @@
+import hashlib
+import json
 import logging
 from fastapi import APIRouter
+from fastapi.responses import Response
 from pydantic import BaseModel
 
 # Configure logging
@@ -8,6 +11,29 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+MOCK_WEATHER = {
+    "forecast": [
+        {"day": 1, "summary": "Sunny", "temperature": "22°C"},
+        {"day": 2, "summary": "Partly cloudy", "temperature": "20°C"},
+        {"day": 3, "summary": "Light rain", "temperature": "18°C"}
+    ]
+}
+
+# Encoded once at import; every request returns the same bytes
+_MOCK_WEATHER_BODY = json.dumps(MOCK_WEATHER, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+# Version of the provider result, also sent as its strong ETag
+MOCK_WEATHER_VERSION = hashlib.blake2b(_MOCK_WEATHER_BODY, digest_size=8).hexdigest()
+_MOCK_WEATHER_HEADERS = {"ETag": f'"{MOCK_WEATHER_VERSION}"'}
+
+
+async def fetch_weather_forecast(destination: str) -> dict:
+    """
+    Returns the mock weather forecast as a fresh dict, decoded from the bytes
+    the endpoint serves so both always agree.
+    """
+    return json.loads(_MOCK_WEATHER_BODY)
+
 class TripRequest(BaseModel):
     uid: str
     destination: str
@@ -19,12 +45,4 @@ async def get_weather(data: TripRequest):
     """
     logger.info(f"Received request for mock weather forecast for UID: {data.uid}")
 
-    mock_weather = {
-        "forecast": [
-            {"day": 1, "summary": "Sunny", "temperature": "22°C"},
-            {"day": 2, "summary": "Partly cloudy", "temperature": "20°C"},
-            {"day": 3, "summary": "Light rain", "temperature": "18°C"}
-        ]
-    }
-
-    return mock_weather
+    return Response(content=_MOCK_WEATHER_BODY, media_type="application/json", headers=_MOCK_WEATHER_HEADERS)
@@ -1,5 +1,7 @@
 
+import json
 from fastapi import FastAPI, Body
+from fastapi.responses import Response
 from pydantic import BaseModel
 from typing import List, Dict, Any
 
@@ -94,6 +96,21 @@ mock_chat_response = {
     "response": "Here is a summary of your trip to Kyoto. I've gathered some initial options for hotels, food, and activities based on your preferences for a cultural and relaxing experience."
 }
 
+def _encode(payload: Dict[str, Any]) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def _json_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
+# Encoded once at import; every request returns the same bytes
+_root_body = _encode({"message": "Driftaway MOCK Backend"})
+_chat_body = _encode(mock_chat_response)
+_hotel_body = _encode(mock_hotel_data)
+_food_body = _encode(mock_food_data)
+_activities_body = _encode(mock_activities_data)
+_transport_body = _encode(mock_transport_data)
+_budget_body = _encode(mock_budget_data)
+
 # --- Pydantic Models (copied from main.py for compatibility) ---
 
 class ChatMessage(BaseModel):
@@ -110,34 +127,34 @@ class ChatRequest(BaseModel):
 
 @app.get("/")
 async def root():
-    return {"message": "Driftaway MOCK Backend"}
+    return _json_response(_root_body)
 
 @app.post("/chat")
-async def mock_chat_endpoint(request: ChatRequest) -> Dict[str, Any]:
+async def mock_chat_endpoint(request: ChatRequest) -> Response:
     """
     Mock endpoint for the chatbot. Returns a static, friendly response.
     """
-    return mock_chat_response
+    return _json_response(_chat_body)
 
 @app.post("/api/hotel")
 async def mock_hotel_mcp(uid: str = Body(..., embed=True)):
-    return mock_hotel_data
+    return _json_response(_hotel_body)
 
 @app.post("/api/food")
 async def mock_food_mcp(uid: str = Body(..., embed=True)):
-    return mock_food_data
+    return _json_response(_food_body)
 
 @app.post("/api/activities")
 async def mock_activities_mcp(uid: str = Body(..., embed=True)):
-    return mock_activities_data
+    return _json_response(_activities_body)
 
 @app.post("/api/transport")
 async def mock_transport_mcp(uid: str = Body(..., embed=True)):
-    return mock_transport_data
+    return _json_response(_transport_body)
 
 @app.post("/api/budget")
 async def mock_budget_mcp(uid: str = Body(..., embed=True)):
-    return mock_budget_data
+    return _json_response(_budget_body)
 
 if __name__ == "__main__":
     import uvicorn
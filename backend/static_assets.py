@@ -0,0 +1,163 @@
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+
+from starlette.responses import Response
+
+from etags import etag_matches
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available
+    brotli = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Vite emits content-hashed names such as index-B7CkK05i.js; those never
+# change in place and can be cached forever.
+_HASHED_NAME = re.compile(r"-[A-Za-z0-9_-]{8}\.[a-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# Only text formats are worth compressing; images are already compressed
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+MIN_COMPRESS_SIZE = 1024
+
+# Server preference when a client accepts several encodings
+_ENCODINGS = ("br", "gzip")
+_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+class StaticAsset:
+    """
+    One file held in memory with its precompressed variants.
+    """
+
+    __slots__ = ("body", "media_type", "cache_control", "etag", "variants")
+
+    def __init__(self, body, media_type, cache_control, variants):
+        self.body = body
+        self.media_type = media_type
+        self.cache_control = cache_control
+        self.etag = f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+        # encoding -> (compressed body, ETag of that representation)
+        self.variants = {
+            encoding: (data, f'{self.etag[:-1]}-{encoding}"')
+            for encoding, data in variants.items()
+        }
+
+
+class StaticAssets:
+    """
+    Serves a built frontend from memory.
+
+    Every file is read once at startup. Text files get gzip (and, when the
+    brotli package is installed, br) variants, taken from .gz/.br files
+    next to the original if the build produced them and compressed once
+    otherwise. Responses pick a variant from Accept-Encoding and answer a
+    matching If-None-Match with 304, so no request touches the disk or
+    compresses anything.
+    """
+
+    def __init__(self, directory, index="index.html"):
+        self.directory = directory
+        self._assets = {}
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if name.endswith((".gz", ".br")):
+                    continue
+                full_path = os.path.join(root, name)
+                path = os.path.relpath(full_path, directory).replace(os.sep, "/")
+                self._assets[path] = self._load(full_path)
+
+        self.index = self._assets.get(index)
+        if self.index is None:
+            # Fail at startup like StaticFiles did, rather than 500 per request
+            raise RuntimeError(f"Frontend build not found: {os.path.join(directory, index)} does not exist")
+        total = sum(len(asset.body) for asset in self._assets.values())
+        logger.info(f"Loaded {len(self._assets)} static files ({total} bytes) from {directory}")
+
+    def get(self, path):
+        return self._assets.get(path)
+
+    def response(self, asset, headers):
+        """
+        Builds the response for an asset given the request headers.
+        """
+        encoding = self._negotiate(asset, headers.get("accept-encoding", ""))
+        body, etag = asset.variants[encoding] if encoding else (asset.body, asset.etag)
+        response_headers = {
+            "ETag": etag,
+            "Cache-Control": asset.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+
+        if etag_matches(headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=response_headers)
+
+        if encoding:
+            response_headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type=asset.media_type, headers=response_headers)
+
+    def _load(self, full_path):
+        with open(full_path, "rb") as f:
+            body = f.read()
+
+        name = os.path.basename(full_path)
+        media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        cache_control = IMMUTABLE_CACHE_CONTROL if _HASHED_NAME.search(name) else REVALIDATE_CACHE_CONTROL
+
+        variants = {}
+        if media_type.startswith(COMPRESSIBLE_TYPES) and len(body) >= MIN_COMPRESS_SIZE:
+            for encoding in _ENCODINGS:
+                data = _read_precompressed(full_path + _SUFFIXES[encoding])
+                if data is None:
+                    data = _compress(body, encoding)
+                if data is not None and len(data) < len(body):
+                    variants[encoding] = data
+
+        return StaticAsset(body, media_type, cache_control, variants)
+
+    @staticmethod
+    def _negotiate(asset, accept_encoding):
+        if not asset.variants or not accept_encoding:
+            return None
+
+        accepted = {}
+        for item in accept_encoding.split(","):
+            coding, _, params = item.strip().partition(";")
+            q = 1.0
+            params = params.strip()
+            if params.startswith("q="):
+                try:
+                    q = float(params[2:])
+                except ValueError:
+                    q = 0.0
+            accepted[coding.strip().lower()] = q
+
+        for encoding in _ENCODINGS:
+            if encoding in asset.variants and accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+                return encoding
+        return None
+
+
+def _read_precompressed(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _compress(body, encoding):
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=9, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(body, quality=11)
+    return None
+
@@ -1,22 +1,180 @@
+import asyncio
 import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from firebase.trip_repository import DEMO_FALLBACK, DEMO_TRIP, SQLiteTripContextRepository, TripContextLoader
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
+TRIP_CONTEXT_TTL = float(os.getenv("TRIP_CONTEXT_TTL", 300))
+TRIP_CONTEXT_MAX_ENTRIES = int(os.getenv("TRIP_CONTEXT_MAX_ENTRIES", 10000))
+
+# Local stand-in for Firestore. In a real application, this would be a
+# Firestore-backed TripContextRepository.
+_repository = SQLiteTripContextRepository(default_context=DEMO_TRIP if DEMO_FALLBACK else None)
+
+# Batches async lookups made in the same event-loop tick into one query
+_loader = TripContextLoader(_repository)
+
+
+def _fetch_trip_context(uid: str) -> dict | None:
+    """
+    Fetches the trip context for the given UID from the repository.
+    """
+    logging.info(f"Fetching trip context for uid: {uid}")
+    return _repository.fetch_many([uid])[uid]
+
+
+# Kept identical to the copy in adk/firebase_utils.py; the services ship as separate
+# images and cannot import each other.
+class TripContextCache:
+    """
+    Caches trip contexts per uid along with a version number.
+
+    The version is bumped every time the uid's context is invalidated, so
+    downstream caches can key off (uid, version) and never serve results
+    built from an older context. Entries also expire after `ttl` seconds to
+    pick up writes made by other processes.
+
+    At most `max_entries` uids are tracked; the least recently used are
+    evicted first. Versions are drawn from one counter shared by all uids,
+    so a uid that is evicted and seen again never reuses an old version.
+    """
+
+    def __init__(self, fetch, load=None, ttl=TRIP_CONTEXT_TTL, max_entries=TRIP_CONTEXT_MAX_ENTRIES):
+        """
+        Args:
+            fetch: Blocking uid -> context lookup used by get().
+            load: Async uid -> context lookup used by aget(); defaults to
+                running fetch in a worker thread.
+            ttl: Seconds a cached context is trusted.
+            max_entries: Most uids tracked at once.
+        """
+        self.fetch = fetch
+        self.load = load
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # uid -> (context, expires_at); only uids present in _versions
+        self._entries = {}
+        # uid -> version, least recently used first
+        self._versions = OrderedDict()
+        self._last_version = 0
+        self._lock = threading.Lock()
+
+    def get(self, uid):
+        """
+        Returns (context, version). The context is None if the uid has no trip.
+        """
+        context, version, hit = self._lookup(uid)
+        if hit:
+            return context, version
+        return self._fill(uid, version, self.fetch(uid)), version
+
+    async def aget(self, uid):
+        """
+        Async get() that loads misses without blocking the event loop.
+        """
+        context, version, hit = self._lookup(uid)
+        if hit:
+            return context, version
+        context = await self.load(uid) if self.load else await asyncio.to_thread(self.fetch, uid)
+        return self._fill(uid, version, context), version
+
+    def _lookup(self, uid):
+        with self._lock:
+            version = self._touch(uid)
+            entry = self._entries.get(uid)
+            if entry is not None and entry[1] <= time.monotonic():
+                del self._entries[uid]
+                entry = None
+        if entry is not None:
+            return entry[0], version, True
+        return None, version, False
+
+    def _fill(self, uid, version, context):
+        with self._lock:
+            # Skip storing if an invalidation or eviction raced with the fetch
+            if self._versions.get(uid) == version and context is not None:
+                self._entries[uid] = (context, time.monotonic() + self.ttl)
+        return context
+
+    def _touch(self, uid):
+        # Returns the uid's version, assigning one and evicting the least
+        # recently used uids if it is new. Caller holds the lock.
+        version = self._versions.get(uid)
+        if version is not None:
+            self._versions.move_to_end(uid)
+            return version
+
+        version = self._versions[uid] = self._next_version()
+        while len(self._versions) > self.max_entries:
+            evicted_uid, _ = self._versions.popitem(last=False)
+            self._entries.pop(evicted_uid, None)
+        return version
+
+    def _next_version(self):
+        self._last_version += 1
+        return self._last_version
+
+    def version(self, uid):
+        with self._lock:
+            return self._touch(uid)
+
+    def invalidate(self, uid):
+        """
+        Drops the cached context and bumps the uid's version.
+        """
+        with self._lock:
+            self._touch(uid)
+            self._entries.pop(uid, None)
+            self._versions[uid] = self._next_version()
+            return self._versions[uid]
+
+
+_trip_context_cache = TripContextCache(_fetch_trip_context, _loader.load)
+
+
 def get_trip_context(uid: str) -> dict | None:
     """
-    Returns a mock trip context for the given UID.
-    In a real application, this would fetch data from a database.
+    Returns the trip context for the given UID, from cache when possible.
+    """
+    context, _ = _trip_context_cache.get(uid)
+    return dict(context) if context is not None else None
+
+
+async def get_trip_context_async(uid: str) -> dict | None:
+    """
+    Returns the trip context for the given UID without blocking the event
+    loop. Concurrent misses are fetched together in one batched query.
     """
-    logging.info(f"Fetching mock trip context for uid: {uid}")
+    context, _ = await _trip_context_cache.aget(uid)
+    return dict(context) if context is not None else None
 
-    # Mock trip data
-    mock_trip = {
-        "destination": "Paris, France",
-        "startDate": "2025-10-15",
-        "endDate": "2025-10-22",
-        "tripStyle": ["sightseeing", "foodie", "romantic"],
-        "travelers": ["couple"],
-    }
 
-    return mock_trip
\ No newline at end of file
+def get_trip_context_version(uid: str) -> int:
+    """
+    Returns the current version of the UID's trip context.
+    """
+    return _trip_context_cache.version(uid)
+
+
+def update_trip_context(uid: str, updates: dict) -> int:
+    """
+    Writes field updates to the UID's trip context and invalidates its cached
+    copy. Returns the new context version.
+    """
+    logging.info(f"Updating trip context fields {list(updates)} for uid: {uid}")
+    _repository.write(uid, updates)
+    return _trip_context_cache.invalidate(uid)
+
+
+def invalidate_trip_context(uid: str) -> int:
+    """
+    Invalidates the UID's cached trip context after an external write.
+    Returns the new context version.
+    """
+    return _trip_context_cache.invalidate(uid)
@@ -0,0 +1,182 @@
+import asyncio
+import json
+import logging
+import os
+import queue
+import sqlite3
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+TRIP_DB_PATH = os.getenv("TRIP_DB_PATH", os.path.join(tempfile.gettempdir(), "driftaway_trips.sqlite"))
+TRIP_DB_POOL_SIZE = int(os.getenv("TRIP_DB_POOL_SIZE", 4))
+
+# SQLite caps the number of bound parameters per statement
+_MAX_BATCH = 500
+
+# Seed trip for local development, stored under DEMO_UID. With
+# TRIP_DB_DEMO_FALLBACK=1, uids without a stored trip fall back to it too.
+DEMO_UID = "shiny123"
+DEMO_TRIP = {
+    "destination": "Paris, France",
+    "startDate": "2025-10-15",
+    "endDate": "2025-10-22",
+    "tripStyle": ["sightseeing", "foodie", "romantic"],
+    "travelers": ["couple"],
+}
+DEMO_FALLBACK = os.getenv("TRIP_DB_DEMO_FALLBACK", "0") == "1"
+
+
+class TripContextRepository(ABC):
+    """
+    Storage interface for trip contexts.
+
+    Implementations provide the blocking fetch_many/write pair; the async
+    methods run them off the event loop.
+    """
+
+    @abstractmethod
+    def fetch_many(self, uids):
+        """
+        Returns {uid: context or None} for every requested uid.
+        """
+
+    @abstractmethod
+    def write(self, uid, updates):
+        """
+        Merges field updates into the uid's stored context.
+        """
+
+    async def get_many(self, uids):
+        return await asyncio.to_thread(self.fetch_many, uids)
+
+    async def update(self, uid, updates):
+        await asyncio.to_thread(self.write, uid, updates)
+
+
+class SQLiteTripContextRepository(TripContextRepository):
+    """
+    Trip contexts stored as JSON in SQLite, for local use and load testing.
+
+    Connections come from a fixed-size pool so concurrent batches do not
+    serialize on a single connection.
+    """
+
+    def __init__(self, path=TRIP_DB_PATH, pool_size=TRIP_DB_POOL_SIZE, default_context=None):
+        self.path = path
+        self.default_context = default_context
+        self._pool = queue.Queue()
+        for _ in range(pool_size):
+            conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._pool.put(conn)
+
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS trips (uid TEXT PRIMARY KEY, context TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO trips (uid, context, updated_at) VALUES (?, ?, ?)",
+                (DEMO_UID, json.dumps(DEMO_TRIP), time.time()),
+            )
+
+    @contextmanager
+    def _connection(self):
+        conn = self._pool.get()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._pool.put(conn)
+
+    def fetch_many(self, uids):
+        uids = list(dict.fromkeys(uids))
+        found = {}
+        with self._connection() as conn:
+            for start in range(0, len(uids), _MAX_BATCH):
+                chunk = uids[start:start + _MAX_BATCH]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(f"SELECT uid, context FROM trips WHERE uid IN ({placeholders})", chunk)
+                found.update((uid, json.loads(context)) for uid, context in rows)
+
+        return {uid: found.get(uid, self._default()) for uid in uids}
+
+    def write(self, uid, updates):
+        with self._connection() as conn:
+            # Take the write lock before reading, so concurrent updates to the
+            # same uid on other pooled connections cannot both read the old
+            # context and lose one of the writes.
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT context FROM trips WHERE uid = ?", (uid,)).fetchone()
+            context = json.loads(row[0]) if row else (self._default() or {})
+            context.update(updates)
+            conn.execute(
+                "INSERT OR REPLACE INTO trips (uid, context, updated_at) VALUES (?, ?, ?)",
+                (uid, json.dumps(context), time.time()),
+            )
+
+    def seed(self, trips):
+        """
+        Bulk-inserts {uid: context}, e.g. to prepare a load test.
+        """
+        now = time.time()
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO trips (uid, context, updated_at) VALUES (?, ?, ?)",
+                ((uid, json.dumps(context), now) for uid, context in trips.items()),
+            )
+
+    def _default(self):
+        return dict(self.default_context) if self.default_context is not None else None
+
+
+class TripContextLoader:
+    """
+    DataLoader-style batching of trip context lookups.
+
+    Every uid requested during the same event-loop tick is collected and
+    fetched with a single get_many call on the next tick. Duplicate uids in
+    a batch share one lookup.
+    """
+
+    def __init__(self, repository):
+        self.repository = repository
+        self._pending = {}
+        self._loop = None
+        self._batches = set()
+
+    async def load(self, uid):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._pending = {}
+
+        future = self._pending.get(uid)
+        if future is None:
+            if not self._pending:
+                loop.call_soon(self._dispatch)
+            future = self._pending[uid] = loop.create_future()
+        return await asyncio.shield(future)
+
+    def _dispatch(self):
+        batch, self._pending = self._pending, {}
+        task = asyncio.ensure_future(self._resolve(batch))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    async def _resolve(self, batch):
+        try:
+            contexts = await self.repository.get_many(list(batch))
+        except Exception as e:
+            logger.exception(f"Trip context batch of {len(batch)} uids failed")
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for uid, future in batch.items():
+            if not future.done():
+                future.set_result(contexts.get(uid))
@@ -4,6 +4,8 @@ const TripChat = ({ destination }) => {
   const [chatHistory, setChatHistory] = useState([]);
   const [chatMessage, setChatMessage] = useState("");
   const [isLoading, setIsLoading] = useState(false);
+  // Conversation history lives on the server; we only keep its id
+  const sessionIdRef = useRef(null);
   const chatHistoryRef = useRef(null);
 
   // Scroll to bottom on chat update
@@ -17,16 +19,17 @@ const TripChat = ({ destination }) => {
   useEffect(() => {
     const sendInitialMessage = async () => {
       try {
-await fetch("/chat", {
+        const response = await fetch("/chat", {
           method: "POST",
           headers: { "Content-Type": "application/json" },
           body: JSON.stringify({
             uid: "shiny123",
             destination,
             message: "init",
-            session_history: [],
           }),
         });
+        const data = await response.json();
+        sessionIdRef.current = data.session_id || null;
       } catch (error) {
         console.error("Error sending initial destination:", error);
       }
@@ -35,19 +38,27 @@ await fetch("/chat", {
     sendInitialMessage();
   }, [destination]);
 
+  // Replaces the content of the last (streaming) assistant message
+  const updateReply = (content) => {
+    setChatHistory((prev) => [
+      ...prev.slice(0, -1),
+      { role: "assistant", content },
+    ]);
+  };
+
   const sendMessage = async () => {
     if (!chatMessage.trim()) return;
     setIsLoading(true);
 
     try {
-      const response = await fetch("/chat", {
+      const response = await fetch("/chat/stream", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({
           uid: "shiny123",
           destination,
           message: chatMessage,
-          session_history: chatHistory,
+          session_id: sessionIdRef.current,
         }),
       });
 
@@ -55,9 +66,34 @@ await fetch("/chat", {
         throw new Error(`HTTP error! status: ${response.status}`);
       }
 
-      const data = await response.json();
-      setChatHistory(data.session_history || []);
+      setChatHistory((prev) => [
+        ...prev,
+        { role: "user", content: chatMessage },
+        { role: "assistant", content: "" },
+      ]);
       setChatMessage("");
+
+      // NDJSON: a session_id line, delta lines, then a done line
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffered = "";
+      let reply = "";
+      for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffered += decoder.decode(value, { stream: true });
+        const lines = buffered.split("\n");
+        buffered = lines.pop();
+        for (const line of lines) {
+          if (!line) continue;
+          const event = JSON.parse(line);
+          if (event.error) throw new Error(event.error);
+          if (event.session_id) sessionIdRef.current = event.session_id;
+          if (event.delta) reply += event.delta;
+          if (event.done) reply = event.message.content;
+        }
+        updateReply(reply);
+      }
     } catch (error) {
       console.error("Error sending message:", error);
       setChatHistory((prev) => [
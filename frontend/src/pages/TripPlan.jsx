@@ -42,60 +42,68 @@ const TripPlan = () => {
             <h2 className="text-2xl font-semibold mb-4 text-gray-700">
               Primary Transport
             </h2>
-            <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
-              <div className="bg-blue-50 p-4 rounded-lg shadow-sm">
-                <h3 className="font-medium text-blue-700">
-                  Outbound: {itinerary.primary_transport.outbound.type}
-                </h3>
-                <p>{itinerary.primary_transport.outbound.details}</p>
-                <p>Price: ${itinerary.primary_transport.outbound.price}</p>
-                <a
-                  href={itinerary.primary_transport.outbound.booking_url}
-                  target="_blank"
-                  rel="noopener noreferrer"
-                  className="text-blue-500 hover:underline"
-                >
-                  Book Now
-                </a>
+            {itinerary.primary_transport ? (
+              <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
+                <div className="bg-blue-50 p-4 rounded-lg shadow-sm">
+                  <h3 className="font-medium text-blue-700">
+                    Outbound: {itinerary.primary_transport.outbound.type}
+                  </h3>
+                  <p>{itinerary.primary_transport.outbound.details}</p>
+                  <p>Price: ${itinerary.primary_transport.outbound.price}</p>
+                  <a
+                    href={itinerary.primary_transport.outbound.booking_url}
+                    target="_blank"
+                    rel="noopener noreferrer"
+                    className="text-blue-500 hover:underline"
+                  >
+                    Book Now
+                  </a>
+                </div>
+                <div className="bg-blue-50 p-4 rounded-lg shadow-sm">
+                  <h3 className="font-medium text-blue-700">
+                    Inbound: {itinerary.primary_transport.inbound.type}
+                  </h3>
+                  <p>{itinerary.primary_transport.inbound.details}</p>
+                  <p>Price: ${itinerary.primary_transport.inbound.price}</p>
+                  <a
+                    href={itinerary.primary_transport.inbound.booking_url}
+                    target="_blank"
+                    rel="noopener noreferrer"
+                    className="text-blue-500 hover:underline"
+                  >
+                    Book Now
+                  </a>
+                </div>
               </div>
-              <div className="bg-blue-50 p-4 rounded-lg shadow-sm">
-                <h3 className="font-medium text-blue-700">
-                  Inbound: {itinerary.primary_transport.inbound.type}
+            ) : (
+              <p className="text-gray-600">Transport options are unavailable right now.</p>
+            )}
+          </section>
+
+          {/* Local Transport */}
+          <section className="mb-8">
+            <h2 className="text-2xl font-semibold mb-4 text-gray-700">
+              Local Transport
+            </h2>
+            {itinerary.local_transport ? (
+              <div className="bg-green-50 p-4 rounded-lg shadow-sm">
+                <h3 className="font-medium text-green-700">
+                  Provider: {itinerary.local_transport.provider}
                 </h3>
-                <p>{itinerary.primary_transport.inbound.details}</p>
-                <p>Price: ${itinerary.primary_transport.inbound.price}</p>
+                <p>{itinerary.local_transport.details}</p>
+                <p>Price: ${itinerary.local_transport.price}</p>
                 <a
-                  href={itinerary.primary_transport.inbound.booking_url}
+                  href={itinerary.local_transport.booking_url}
                   target="_blank"
                   rel="noopener noreferrer"
-                  className="text-blue-500 hover:underline"
+                  className="text-green-500 hover:underline"
                 >
                   Book Now
                 </a>
               </div>
-            </div>
-          </section>
-
-          {/* Local Transport */}
-          <section className="mb-8">
-            <h2 className="text-2xl font-semibold mb-4 text-gray-700">
-              Local Transport
-            </h2>
-            <div className="bg-green-50 p-4 rounded-lg shadow-sm">
-              <h3 className="font-medium text-green-700">
-                Provider: {itinerary.local_transport.provider}
-              </h3>
-              <p>{itinerary.local_transport.details}</p>
-              <p>Price: ${itinerary.local_transport.price}</p>
-              <a
-                href={itinerary.local_transport.booking_url}
-                target="_blank"
-                rel="noopener noreferrer"
-                className="text-green-500 hover:underline"
-              >
-                Book Now
-              </a>
-            </div>
+            ) : (
+              <p className="text-gray-600">Local transport is unavailable right now.</p>
+            )}
           </section>
 
           {/* Daily Activities */}